@@ -0,0 +1,69 @@
+"""
+Backend micro-benchmark.
+- Spawns a child Python process holding a 1 MiB buffer as the stand-in target.
+- Times 4-byte reads, in-place readinto and writes through every backend that can attach here.
+- Usage: python benchmarks/bench_backends.py [iterations]
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hcr_core import memory as trainer
+
+CHILD = (
+    "import ctypes, sys\n"
+    "buf = bytearray(1 << 20)\n"
+    "print(ctypes.addressof((ctypes.c_char * len(buf)).from_buffer(buf)), flush=True)\n"
+    "sys.stdin.read()\n"
+)
+
+def bench(label, fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<50} {n / dt:>12,.0f} ops/s  {dt / n * 1e6:8.2f} us/op")
+
+def run_backend(label, mem, addr, n):
+    buf = bytearray(4)
+    bench(f"{label} read_uint", lambda: mem.read_uint(addr), n)
+    bench(f"{label} readinto (reused buffer)", lambda: mem.readinto(addr, buf), n)
+    bench(f"{label} write_uint", lambda: mem.write_uint(addr, 12345), n)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    child = subprocess.Popen([sys.executable, "-c", CHILD], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        addr = int(child.stdout.readline())
+        mem = trainer.MemHelper()
+        if sys.platform == "win32":
+            variants = [("native", lambda: trainer.NativeWinBackend(child.pid))]
+        else:
+            variants = [("native /proc/pid/mem", lambda: trainer.NativeLinuxBackend(child.pid, use_proc_mem=True)),
+                        ("native process_vm_readv", lambda: trainer.NativeLinuxBackend(child.pid, use_proc_mem=False))]
+        for label, make in variants:
+            try:
+                mem.attach_backend(make())
+            except Exception as e:
+                print(f"{label:<50} unavailable: {e}")
+                continue
+            run_backend(label, mem, addr, n)
+            mem.detach()
+        try:
+            mem.attach_by_pid(child.pid, backend="legacy")
+            run_backend("legacy (rwm/pymem)", mem, addr, n)
+            mem.detach()
+        except Exception as e:
+            print(f"{'legacy (rwm/pymem)':<50} unavailable: {e}")
+        sim = trainer.SimBackend()
+        mem.attach_backend(sim)
+        run_backend("sim (in-process)", mem, sim.base + 0x100, n)
+    finally:
+        child.stdin.close()
+        child.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Cold start benchmark for the V1 trainer.
+- Launches hill_climb_racing_trainer.py N times with HCR_STARTUP_TIMING=1 (it exits once the values are shown).
+- Reports median wall time, in-process startup and attach phases.
+- --core runs V1's path without Tk instead (imports, attach, first coin/diamond reads), for
+  machines without a display.
+- Usage: python benchmarks/bench_cold_start.py [runs] [--sim] [--core]   (--sim: no game needed)
+"""
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# what hill_climb_racing_trainer.py does up to showing the values, minus the window
+CORE = """
+import time
+started = time.perf_counter()
+from hcr_core.attach import get_session
+from hcr_core.fields import GAME_PROCESS, COINS_OFFSET, DIAMONDS_OFFSET
+session = get_session()
+session.attach(GAME_PROCESS, module=None)
+session.mem.read_uint(session.base_address + COINS_OFFSET)
+session.mem.read_uint(session.base_address + DIAMONDS_OFFSET)
+print(f"startup_ms={(time.perf_counter() - started) * 1000:.1f} attach_ms={session.timings['attach'] * 1000:.1f} "
+      f"module_base_ms={session.timings['module_base'] * 1000:.1f}")
+"""
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    runs = int(args[0]) if args else 10
+    env = dict(os.environ, HCR_STARTUP_TIMING="1")
+    if "--sim" in sys.argv:
+        env["HCR_MEM_BACKEND"] = "sim"
+    cmd = [sys.executable, "-c", CORE] if "--core" in sys.argv else [sys.executable, "hill_climb_racing_trainer.py"]
+    walls, fields = [], {}
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True).stdout
+        walls.append((time.perf_counter() - t0) * 1000)
+        for part in out.split():
+            if "=" in part:
+                k, v = part.split("=", 1)
+                fields.setdefault(k, []).append(float(v))
+    print(f"runs: {runs}")
+    print(f"{'wall_ms':<16} {statistics.median(walls):8.1f}")
+    for k, vals in fields.items():
+        print(f"{k:<16} {statistics.median(vals):8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+MemHelper contention stress test.
+- N threads hammer one MemHelper with a mixed read/write/pointer workload (like freeze + hotkeys + Tk).
+- A separate thread detaches and re-attaches every `--churn` seconds; ops must never hit a closed handle.
+- Reports total throughput and per-op latency percentiles for each thread count.
+- --native runs against a child process through the native backend (--vm: process_vm_readv on Linux)
+  instead of SimBackend, and every read is checked against the known contents ("corrupt").
+- Usage: python benchmarks/bench_contention.py [seconds] [--churn 0.05] [--threads 1,2,4,8,16] [--native [--vm]]
+"""
+
+import os
+import sys
+import time
+import struct
+import threading
+import subprocess
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hcr_core.memory import MemHelper, SimBackend, NativeWinBackend, NativeLinuxBackend
+
+MAX_SAMPLES = 200_000   # per thread, preallocated so recording never allocates
+COINS, DIAMONDS = 0x11111111, 0x22222222    # known values at base+0x10 / base+0x28
+
+CHILD = (
+    "import ctypes, sys\n"
+    "buf = bytearray(1 << 16)\n"
+    "print(ctypes.addressof((ctypes.c_char * len(buf)).from_buffer(buf)), flush=True)\n"
+    "sys.stdin.read()\n"
+)
+
+def arg(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def worker(mem, base, stop, lat, counts, errors, corrupt, idx):
+    slot, obj = base + 0x100, base + 0x2000
+    psize = 4 if base + 0x2000 <= 0xFFFFFFFF else 8     # a 64-bit child keeps 8-byte pointers
+    fuel = struct.pack('<f', 100.0)
+    wallet = [struct.pack('<I', COINS), struct.pack('<I', DIAMONDS)]
+    n = 0
+    perf = time.perf_counter
+    while not stop.is_set():
+        t0 = perf()
+        try:
+            op = n & 3
+            if op == 0:
+                if mem.read_uint(base + 0x10) != COINS:
+                    corrupt[idx] += 1
+            elif op == 1:
+                mem.write_bytes(obj + 0x2A8, fuel)
+            elif op == 2:
+                got = mem.read_many([base + 0x10, base + 0x28])
+                if None in got:
+                    errors[idx] += 1        # read_many reports a detached target as unreadable
+                elif got != wallet:
+                    corrupt[idx] += 1
+            else:
+                if mem.resolve_pointer(slot, [0x2A8], psize) != obj + 0x2A8:
+                    corrupt[idx] += 1
+        except RuntimeError:
+            # detached right now (between churn cycles): expected, counted separately
+            errors[idx] += 1
+        except Exception as e:
+            print(f"unexpected {type(e).__name__}: {e}")
+            errors[idx] += 1
+        if n < MAX_SAMPLES:
+            lat[n] = perf() - t0
+        n += 1
+    counts[idx] = n
+
+def churn(mem, make, stop, every, cycles):
+    while not stop.wait(every):
+        mem.detach()
+        mem.attach_backend(make())
+        cycles[0] += 1
+
+def pct(sorted_vals, p):
+    return sorted_vals[min(len(sorted_vals) - 1, int(len(sorted_vals) * p))] * 1e6
+
+def run(nthreads, seconds, churn_every, make, base):
+    """`make()` opens a backend on the target; `base` is where the test layout goes in it."""
+    mem = MemHelper()
+    mem.attach_backend(make())
+    mem.write_uint(base + 0x10, COINS)
+    mem.write_uint(base + 0x28, DIAMONDS)
+    mem.write_bytes(base + 0x100, struct.pack('<I' if base + 0x2000 <= 0xFFFFFFFF else '<Q', base + 0x2000))
+    stop = threading.Event()
+    lats = [array('d', bytes(8 * MAX_SAMPLES)) for _ in range(nthreads)]
+    counts, errors, corrupt, cycles = [0] * nthreads, [0] * nthreads, [0] * nthreads, [0]
+    threads = [threading.Thread(target=worker, args=(mem, base, stop, lats[i], counts, errors, corrupt, i)) for i in range(nthreads)]
+    if churn_every:
+        threads.append(threading.Thread(target=churn, args=(mem, make, stop, churn_every, cycles)))
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    mem.detach()
+    dt = time.perf_counter() - t0
+    samples = sorted(v for i in range(nthreads) for v in lats[i][:min(counts[i], MAX_SAMPLES)])
+    total = sum(counts)
+    print(f"{nthreads:>3} threads  {total / dt:>11,.0f} ops/s  p50 {pct(samples, 0.5):7.1f}us  p99 {pct(samples, 0.99):8.1f}us"
+          f"  p99.9 {pct(samples, 0.999):8.1f}us  max {samples[-1] * 1e6:9.1f}us  detached-errors {sum(errors)}"
+          f"  corrupt {sum(corrupt)}  churns {cycles[0]}")
+
+def main():
+    args = [a for i, a in enumerate(sys.argv[1:], 1) if not a.startswith("--") and not sys.argv[i - 1].startswith("--")]
+    seconds = float(args[0]) if args else 2.0
+    churn_every = float(arg("--churn", "0.05"))
+    child = None
+    if "--native" in sys.argv:
+        child = subprocess.Popen([sys.executable, "-c", CHILD], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        base = int(child.stdout.readline())
+        if sys.platform == "win32":
+            make = lambda: NativeWinBackend(child.pid)
+        else:
+            use_proc_mem = "--vm" not in sys.argv
+            make = lambda: NativeLinuxBackend(child.pid, use_proc_mem=use_proc_mem)
+    else:
+        sim = SimBackend(size=0x10000)
+        sim.close = lambda: None    # keep the heap across churn cycles
+        make, base = (lambda: sim), sim.base
+    try:
+        for n in (int(x) for x in arg("--threads", "1,2,4,8,16").split(",")):
+            run(n, seconds, churn_every, make, base)
+    finally:
+        if child is not None:
+            child.stdin.close()
+            child.wait()
+
+if __name__ == "__main__":
+    main()
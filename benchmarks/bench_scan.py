@@ -0,0 +1,74 @@
+"""
+Narrowing-scan benchmark on a large simulated heap.
+- Fills a SimBackend heap with random ints, runs an unknown-value first scan, then several
+  next scans while a small share of the pages changes between passes (like a running game).
+- Compares full re-decoding against the per-page checksum path, in-process and with a process pool.
+- Usage: python benchmarks/bench_scan.py [heap_mib] [--passes 6] [--dirty 0.01] [--workers N]
+"""
+
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hcr_core.memory import MemHelper, SimBackend
+from hcr_core.scan import Scanner, PAGE
+
+def arg(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def make_heap(mib):
+    sim = SimBackend(size=mib << 20)
+    sim.heap[:] = random.Random(1).randbytes(len(sim.heap))
+    return sim
+
+def mutate(sim, share, rng):
+    """Bump one int in a random `share` of the pages; the target int at the heap start always drops."""
+    pages = len(sim.heap) // PAGE
+    for p in rng.sample(range(pages), max(1, int(pages * share))):
+        off = p * PAGE + rng.randrange(0, PAGE, 4)
+        sim.heap[off:off + 4] = rng.randbytes(4)
+    cur = int.from_bytes(sim.heap[0:4], "little")
+    sim.heap[0:4] = ((cur - 1) & 0xFFFFFFFF).to_bytes(4, "little")
+
+def run(label, mib, passes, share, **kw):
+    sim = make_heap(mib)
+    sim.heap[0:4] = (1000).to_bytes(4, "little")
+    mem = MemHelper()
+    mem.attach_backend(sim)
+    sc = Scanner(mem, "I", **kw)
+    rng = random.Random(2)
+    sc.first_scan()
+    first = sc.last.seconds
+    total = 0.0
+    ops = ["decreased", "unchanged"]
+    for i in range(passes):
+        mutate(sim, share, rng) if ops[i % 2] == "decreased" else None
+        sc.next_scan(ops[i % 2])
+        total += sc.last.seconds
+        last = sc.last
+    sc.close()
+    found = [a for a, _ in sc.results(10)]
+    print(f"{label:<34} first {first * 1e3:8.1f} ms  next avg {total / passes * 1e3:8.1f} ms"
+          f"  (last: {last.pages} pages, {last.skipped} skipped, {last.decoded} decoded)  hits {sc.count}"
+          f"  target found {sim.base in found}")
+    return total / passes
+
+def main():
+    args = [a for i, a in enumerate(sys.argv[1:], 1) if not a.startswith("--") and not sys.argv[i - 1].startswith("--")]
+    mib = int(args[0]) if args else 64
+    passes = int(arg("--passes", "6"))
+    share = float(arg("--dirty", "0.01"))
+    workers = int(arg("--workers", str(os.cpu_count() or 1)))
+    print(f"heap {mib} MiB, {passes} next scans, {share:.1%} of pages dirtied per pass, {workers} workers")
+    full = run("full re-decode, 1 process", mib, passes, share, workers=1, checksums=False)
+    crc = run("page checksums, 1 process", mib, passes, share, workers=1)
+    print(f"checksum speedup on next scans: {full / crc:.1f}x")
+    if workers > 1:
+        pooled = run(f"page checksums, {workers} processes", mib, passes, share, workers=workers)
+        print(f"pool speedup over 1 process: {crc / pooled:.1f}x")
+
+if __name__ == "__main__":
+    main()
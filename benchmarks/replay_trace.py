@@ -0,0 +1,177 @@
+"""
+Trace tool for MemHelper I/O traces (record one with HCR_TRACE=<file> while the trainer runs).
+- info PATH                          per-op counts and recorded latencies
+- replay PATH [--speed 1|max] [--serial] [--repeat N]
+                                     drive the trace against a simulated target seeded from it
+- record PATH [seconds]              record a synthetic freeze + hotkey + UI workload on the simulator
+- overhead [iterations]              cost of tracing on the read_uint hot path
+- check                              record every op type once and verify it decodes to what the call returned
+"""
+
+import os
+import sys
+import time
+import struct
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hcr_core.attach import GameSession
+from hcr_core.memory import MemHelper, SimBackend, SparseSimBackend, plan_reads, span_buffers
+from hcr_core.trace import TraceRecorder, load_trace, replay
+
+def arg(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+def positional():
+    return [a for i, a in enumerate(sys.argv[1:], 1) if not a.startswith("--") and not sys.argv[i - 1].startswith("--")]
+
+def print_table(stats, recorded=True):
+    print(f"{'op':<26}{'count':>9}{'recorded us':>14}{'replay us':>12}{'errors':>9}{'rec errors':>12}")
+    for name, (count, rec_ns, rep_ns, errors, rec_errors) in sorted(stats.items(), key=lambda kv: -kv[1][0]):
+        rep = f"{rep_ns / count / 1e3:12.2f}" if rep_ns else f"{'-':>12}"
+        print(f"{name:<26}{count:>9}{rec_ns / count / 1e3:14.2f}{rep}{errors:>9}{rec_errors:>12}")
+
+def info(path):
+    meta, ops = load_trace(path)
+    stats = {}
+    for op in ops:
+        if op.nested:
+            continue
+        st = stats.setdefault(op.op, [0, 0, 0, 0, 0])
+        st[0] += 1
+        st[1] += op.dur
+        st[4] += op.error
+    span = (ops[-1].t - ops[0].t) / 1e9 if ops else 0
+    top = sum(st[0] for st in stats.values())
+    print(f"{path}: backend {meta['backend']}, {len(ops)} records ({top} top-level), "
+          f"{len({op.thread for op in ops})} threads, {span:.2f} s, {os.path.getsize(path) / max(1, len(ops)):.1f} bytes/record")
+    print_table(stats)
+
+def run_replay(path):
+    _, ops = load_trace(path)
+    speed = arg("--speed", "max")
+    speed = None if speed == "max" else float(speed)
+    for _ in range(int(arg("--repeat", "1"))):
+        wall, stats = replay(ops, speed=speed, threaded="--serial" not in sys.argv)
+        total = sum(st[0] for st in stats.values())
+        print(f"replayed {total} ops in {wall * 1e3:.1f} ms ({total / wall if wall else 0:,.0f} ops/s, "
+              f"speed {'max' if speed is None else speed})")
+        print_table(stats)
+
+def record(path, seconds):
+    """Synthetic session: fuel freezer, hotkey coin writes and a UI poll, each on its own thread."""
+    session = GameSession()
+    sim = SimBackend()
+    session.attach_backend(sim)
+    fuel_obj = sim.base + 0x300000
+    session.mem.write_uint(session.field_base("fuel"), fuel_obj)
+    tracer = TraceRecorder(path).start(session.mem)
+    stop = threading.Event()
+    coins_addr, diamonds_addr = session.field_base("coins"), session.field_base("diamonds")
+
+    def freezer():
+        while not stop.wait(0.02):
+            addr = session.field_addr("fuel")
+            if session.mem.read_float(addr) != 100.0:
+                session.mem.write_bytes(addr, struct.pack('<f', 100.0))
+
+    def burn():
+        while not stop.wait(0.005):
+            session.mem.write_bytes(fuel_obj + 0x2A8, struct.pack('<f', 42.0))
+
+    def hotkeys():
+        while not stop.wait(0.1):
+            session.mem.write_uint(coins_addr, session.mem.read_uint(coins_addr) + 1000)
+
+    def ui():
+        while not stop.wait(0.05):
+            session.mem.read_many([coins_addr, diamonds_addr])
+
+    threads = [threading.Thread(target=f) for f in (freezer, burn, hotkeys, ui)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    tracer.stop()
+    print(f"recorded {tracer.records} records to {path}")
+
+def overhead(n):
+    sim = SimBackend()
+    mem = MemHelper()
+    mem.attach_backend(sim)
+    addr = sim.base + 0x10
+    for label in ("untraced", "traced"):
+        tracer = TraceRecorder(os.devnull).start(mem) if label == "traced" else None
+        t0 = time.perf_counter()
+        for _ in range(n):
+            mem.read_uint(addr)
+        dt = time.perf_counter() - t0
+        if tracer:
+            tracer.stop()
+        print(f"read_uint {label:<9} {n / dt:>12,.0f} ops/s  {dt / n * 1e6:6.2f} us/op")
+
+def check():
+    """Encode/decode round trip over every traced op, including a pointer >= 0x80000000 and failing ops."""
+    fd, path = tempfile.mkstemp(prefix="hcr-check-", suffix=".hcrtrc")
+    os.close(fd)
+    sim = SparseSimBackend()
+    sim.modules["game.exe"] = 0x400000
+    sim.map(0x10000, 0x1000)
+    sim.write(0x10000, struct.pack('<I', 0x80001000))       # read_int sees a negative pointer
+    sim.write(0x10040, struct.pack('<f', 42.5))
+    mem = MemHelper()
+    mem.attach_backend(sim)
+    plan = plan_reads([0x10000, 0x10040, 0x90000])
+    calls = [
+        ("module_base", ("game.exe",)), ("read_int", (0x10000,)), ("read_uint", (0x10000,)),
+        ("read_longlong", (0x10000,)), ("read_float", (0x10040,)), ("read_bytes", (0x10000, 16)),
+        ("readinto", (0x10000, bytearray(8))), ("read_spans", (plan,)), ("read_spans", (plan, span_buffers(plan))),
+        ("read_many", ([0x10000, None, 0x10040, 0x90000],)), ("write_bytes", (0x10100, b"\x01\x02")),
+        ("write_int", (0x10104, -5)), ("write_uint", (0x10108, 7)), ("write_float_bytes_as_int", (0x1010C, 1.5)),
+        ("resolve_pointer", (0x10000, [0x10])), ("resolve_pointer", (0x90000, [0x10])), ("read_uint", (0x90000,)),
+    ]
+    tracer = TraceRecorder(path).start(mem)
+    expected = []
+    for name, args in calls:
+        try:
+            ret = getattr(mem, name)(*args)
+            if name == "readinto":
+                ret = bytes(args[1])
+            elif name in ("read_spans", "read_many"):
+                ret = [None if b is None else bytes(b) for b in ret]
+            expected.append((name, False, None if name.startswith("write") else ret))
+        except Exception:
+            expected.append((name, True, None))
+    tracer.stop()
+    _, ops = load_trace(path)
+    os.remove(path)
+    got = [(op.op, op.error, None if op.result is None else
+            [None if b is None else bytes(b) for b in op.result] if isinstance(op.result, list) else op.result)
+           for op in ops if not op.nested]
+    bad = [(e, g) for e, g in zip(expected, got) if e != g]
+    print(f"{len(got)}/{len(expected)} top-level ops decoded, {len(bad)} mismatches, {tracer.dropped} dropped")
+    for e, g in bad:
+        print(f"  recorded {e}\n  decoded  {g}")
+    return not bad and len(got) == len(expected) and not tracer.dropped
+
+def main():
+    args = positional()
+    cmd = args[0] if args else "overhead"
+    if cmd == "info":
+        info(args[1])
+    elif cmd == "replay":
+        run_replay(args[1])
+    elif cmd == "record":
+        record(args[1], float(args[2]) if len(args) > 2 else 2.0)
+    elif cmd == "check":
+        sys.exit(0 if check() else 1)
+    else:
+        overhead(int(args[1]) if len(args) > 1 else 200_000)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Shared core for the Hill Climb Racing trainers (V1 and V2 are thin Tk frontends).
+- memory: backends, MemHelper, RegionMap
+- fields: offsets, the field table and object layouts
+- layouts: Layout / ObjectView (whole-object reads, dirty-field writes)
+- snapshots: bounded snapshot history with one-write-per-region restore (SnapshotStore).
+- hotkeys: every global hotkey on one keyboard hook (HotkeyHub).
+- correlate: rank addresses by how they move over K samples (CorrelationScan, needs numpy).
+- attach: lazy single attach (GameSession / get_session)
+- watch, race, recorder, scripts, profiles: V2 services, import them from their modules.
+- aio: asyncio facade (AsyncMem) over MemHelper.
+- scan: first scan / next scan (Scanner) with per-page checksums and a process pool.
+- trace: record MemHelper I/O traces (HCR_TRACE=<file>) and replay them on the simulator.
+"""
+
+from .memory import MemHelper, SimBackend, open_native_backend, plan_reads, span_buffers
+from .fields import FIELDS, GAME_PROCESS, GAME_MODULE
+from .attach import GameSession, get_session
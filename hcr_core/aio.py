@@ -0,0 +1,112 @@
+"""
+asyncio facade over MemHelper.
+- Blocking I/O runs on a small bounded thread pool; at most `max_pending` ops are queued (backpressure).
+- Every call takes an optional timeout and is cancellable.
+- Freezes and change streams are plain asyncio tasks / async generators, so many share one loop.
+
+    amem = AsyncMem(session.mem)
+    coins, diamonds = await amem.read_many([coins_addr, diamonds_addr])
+    task = amem.freeze(fuel_addr, struct.pack('<f', 100.0))
+    ...
+    task.cancel()
+"""
+
+import struct
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+class AsyncMem:
+    def __init__(self, mem, max_workers=4, max_pending=64):
+        self.mem = mem
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hcr-io")
+        self._max_pending = max_pending
+        self._slots = None          # created on first use, inside the running loop
+
+    async def _call(self, fn, *args, timeout=None):
+        loop = asyncio.get_running_loop()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_pending)
+        slots = self._slots
+        # waits here while max_pending ops are in flight
+        await slots.acquire()
+        try:
+            cfut = self._executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # free the slot only when the worker is really done (a cancelled await doesn't stop a running read)
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                pass        # loop already closed
+        cfut.add_done_callback(release)
+        return await asyncio.wait_for(asyncio.wrap_future(cfut), timeout)
+
+    # reads
+    async def read(self, addr, size, timeout=None):
+        return await self._call(self.mem.read_bytes, addr, size, timeout=timeout)
+
+    async def read_uint(self, addr, timeout=None):
+        return await self._call(self.mem.read_uint, addr, timeout=timeout)
+
+    async def read_int(self, addr, timeout=None):
+        return await self._call(self.mem.read_int, addr, timeout=timeout)
+
+    async def read_float(self, addr, timeout=None):
+        return await self._call(self.mem.read_float, addr, timeout=timeout)
+
+    async def read_many(self, addrs, size=4, timeout=None):
+        """Batched read (one executor job, coalesced spans); None where unreadable."""
+        return await self._call(self.mem.read_many, addrs, size, timeout=timeout)
+
+    async def resolve_pointer(self, base_addr, offsets, timeout=None):
+        return await self._call(self.mem.resolve_pointer, base_addr, offsets, timeout=timeout)
+
+    # writes
+    async def write(self, addr, data, timeout=None):
+        return await self._call(self.mem.write_bytes, addr, bytes(data), timeout=timeout)
+
+    async def write_uint(self, addr, value, timeout=None):
+        return await self.write(addr, struct.pack('<I', int(value)), timeout=timeout)
+
+    async def write_int(self, addr, value, timeout=None):
+        return await self.write(addr, struct.pack('<i', int(value)), timeout=timeout)
+
+    async def write_float(self, addr, value, timeout=None):
+        return await self.write(addr, struct.pack('<f', float(value)), timeout=timeout)
+
+    # long-running tasks
+    def freeze(self, addr, data, interval=0.05):
+        """Task that keeps `data` at `addr` (rewrites only when it changed); cancel() to stop."""
+        return asyncio.ensure_future(self._freeze(addr, bytes(data), interval))
+
+    async def _freeze(self, addr, data, interval):
+        # any failure (unreadable page, timeout, detached MemHelper, pymem/RWM errors) only skips
+        # a round, so the freeze outlives a detach / reattach; cancel() still stops it because
+        # CancelledError is not an Exception
+        written = False
+        while True:
+            try:
+                if not written or await self.read(addr, len(data), timeout=interval * 4) != data:
+                    await self.write(addr, data, timeout=interval * 4)
+                written = True
+            except Exception:
+                pass
+            await asyncio.sleep(interval)
+
+    async def changes(self, addr, size=4, interval=0.05):
+        """Async generator of (old, new) raw bytes each time the value at `addr` changes."""
+        last = None
+        while True:
+            try:
+                cur = await self.read(addr, size, timeout=interval * 4)
+            except Exception:
+                cur = None
+            if cur is not None and cur != last:
+                yield last, cur
+                last = cur
+            await asyncio.sleep(interval)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,162 @@
+"""
+Attach logic shared by both trainers.
+- GameSession attaches lazily, exactly once, with a single process handle.
+- Module bases come from that handle (no second pymem open).
+"""
+
+import time
+import threading
+
+from .memory import MemHelper
+from .fields import FIELDS, GAME_PROCESS, GAME_MODULE, GLOBALS, GLOBALS_OFFSET, FUEL_OBJECT, BOOST_OBJECT
+from .layouts import ObjectView
+from .trace import TRACE_PATH, TraceRecorder
+
+# ---------------------------
+# EXACT functions you asked to keep (unchanged)
+# ---------------------------
+def get_module_base_address(process_name, module_name):
+    try:
+        import pymem
+        import pymem.process
+        pm = pymem.Pymem(process_name)
+        module = pymem.process.module_from_name(pm.process_handle, module_name)
+        if module:
+            return module.lpBaseOfDll
+        else:
+            return 0x0
+    except:
+        return 0x0
+
+def get_base_address(process_name):
+    try:
+        import pymem
+        import pymem.process
+        pm = pymem.Pymem(f"{process_name}")
+        return pymem.process.module_from_name(pm.process_handle, f"{process_name}").lpBaseOfDll
+    except:
+        return 0x0
+
+# ---------------------------
+# Game session (lazy, attach once)
+# ---------------------------
+class GameSession:
+    """The attached game: one MemHelper plus the resolved base addresses.
+
+    Nothing touches the process until `attach()` is first called; later calls
+    return immediately. `timings` records how long each attach phase took.
+    """
+    def __init__(self):
+        self.mem = MemHelper()
+        self.game = None
+        self.module = None
+        self.base_address = 0
+        self.module_base = 0
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    @property
+    def attached(self):
+        return self.mem.pid is not None
+
+    def attach(self, game=GAME_PROCESS, module=GAME_MODULE, backend=None):
+        with self._lock:
+            if self.attached:
+                return self
+            t0 = time.perf_counter()
+            self.mem.attach_by_name(game, backend)
+            t1 = time.perf_counter()
+            try:
+                self.base_address = self.mem.module_base(game)
+            except Exception:
+                self.base_address = 0
+            try:
+                self.module_base = self.mem.module_base(module) if module else 0
+            except Exception:
+                self.module_base = 0
+            self.game, self.module = game, module
+            self.timings = {"attach": t1 - t0, "module_base": time.perf_counter() - t1}
+            self._start_trace()
+            return self
+
+    def attach_backend(self, io, game=GAME_PROCESS, module=GAME_MODULE):
+        """Attach to an already-open backend (e.g. SimBackend) instead of a process name."""
+        with self._lock:
+            self.mem.attach_backend(io)
+            self.base_address = io.module_base(game)
+            self.module_base = io.module_base(module) if module else 0
+            self.game, self.module = game, module
+            self._start_trace()
+            return self
+
+    def _start_trace(self):
+        # HCR_TRACE=<file>: record every memory operation of this session (see trace.py)
+        if TRACE_PATH and self.mem.tracer is None:
+            TraceRecorder(TRACE_PATH).start(self.mem)
+
+    def detach(self):
+        with self._lock:
+            if self.mem.tracer is not None:
+                self.mem.tracer.stop()
+            self.mem.detach()
+            self.base_address = self.module_base = 0
+
+    def field_base(self, name):
+        field = FIELDS[name]
+        base = self.module_base if field.module else self.base_address
+        if not base:
+            raise RuntimeError("Module base unknown. Set module variable if needed." if field.module else "Base address unknown.")
+        return int(base) + field.offset
+
+    def field_addr(self, name):
+        """Address of a managed value; fuel and boost are found through their object views."""
+        if name == "fuel":
+            return self.fuel_object_view().field_addr("fuel")
+        if name == "boost":
+            return self.boost_object_view().field_addr("boost")
+        field = FIELDS[name]
+        addr = self.field_base(name)
+        if field.chain:
+            addr = self.mem.resolve_pointer(addr, field.chain)
+        return addr
+
+    def globals_view(self):
+        """ObjectView over the static globals block (fuel pointer, coins, diamonds); call .read()."""
+        if not self.base_address:
+            raise RuntimeError("Base address unknown.")
+        return ObjectView(self.mem, GLOBALS, int(self.base_address) + GLOBALS_OFFSET)
+
+    def fuel_object_view(self):
+        """ObjectView over the current fuel object (pointer followed strictly, no fallback)."""
+        ptr = self.globals_view().read()["fuel_object"]
+        if not ptr:
+            raise RuntimeError("Fuel object not allocated (not in a race?)")
+        return ObjectView(self.mem, FUEL_OBJECT, ptr)
+
+    def boost_object_view(self, chain=None):
+        """ObjectView over the object at the end of the boost chain (default BOOST_OFFSETS).
+
+        Hops are followed strictly (no `resolve_pointer`-style null hop or fallback):
+        a null or implausible pointer raises, so snapshots, restores and writes never
+        land on a stale address.
+        """
+        chain = list(chain or FIELDS["boost"].chain)
+        cur = self.field_base("boost")
+        # every hop but the last leads to the object; the last offset is the field inside it
+        for i, off in enumerate(chain[:-1] + [0]):
+            ptr = self.mem.read_uint(cur)
+            if ptr < 0x10000 or ptr & 3:
+                raise RuntimeError(f"Boost pointer chain broken at hop {i} ({hex(ptr)})")
+            cur = ptr + off
+        return ObjectView(self.mem, BOOST_OBJECT, cur)
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """The process-wide GameSession (created on first use, never attached here)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = GameSession()
+        return _session
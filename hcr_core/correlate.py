@@ -0,0 +1,200 @@
+"""
+Correlation scan: find values that move a known way (fuel draining) without knowing their value.
+- Samples the candidate regions K times into one (samples x bytes) matrix; each region is read
+  straight into its slice of the row. Ranking works on a float32 (or int) view of it:
+  one column per aligned address.
+- Ranks columns by how steadily they decrease / increase, or by Pearson correlation with a
+  signal supplied by the caller (one value per sample).
+- A matrix larger than `max_ram` lives in a memory-mapped temp file instead.
+- Ranking runs column blocks on a thread pool; numpy drops the GIL inside the reductions,
+  so the blocks really run on separate cores.
+
+    corr = CorrelationScan(session.mem, lo=heap_lo, hi=heap_hi, samples=40)
+    corr.start(rate=10); corr.wait()          # during a race
+    corr.rank("decreasing", lo=0.0, hi=100.0)  # [(addr, score, first, last), ...]
+"""
+
+import os
+import time
+import bisect
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+from .memory import REGION_WRITE
+
+BLOCK_COLUMNS = 1 << 16         # columns per ranking job (samples x 256 KiB per block for float32)
+MODES = ("decreasing", "increasing", "signal")
+
+class CorrelationScan:
+    """Samples [(start, end), ...] regions (default: writable memory in [lo, hi)) `samples` times."""
+    def __init__(self, mem, regions=None, lo=0, hi=None, samples=32, code="f", max_ram=512 << 20,
+                 spill_dir=None, workers=None):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for correlation scans")
+        self.mem = mem
+        self.samples = samples
+        self.dtype = np.dtype('<' + {"f": "f4", "i": "i4", "I": "u4"}[code])
+        self.workers = workers or os.cpu_count() or 1
+        if regions is None:
+            rmap = mem.region_map
+            if rmap is None:
+                raise RuntimeError("Backend can't list memory regions")
+            rmap.refresh()
+            regions = [(s, e) for s, e in rmap.readable_regions(lo, hi) if rmap.flags(s) & REGION_WRITE]
+        width = self.dtype.itemsize
+        # whole aligned slots only; region i occupies bytes [offsets[i], offsets[i+1]) of every row
+        self.regions = [(s, e - (e - s) % width) for s, e in sorted(regions) if e - s >= width]
+        self.offsets = [0]
+        for s, e in self.regions:
+            self.offsets.append(self.offsets[-1] + e - s)
+        self.row_bytes = self.offsets[-1]
+        if not self.row_bytes:
+            raise RuntimeError("No memory to sample")
+        self.spill_path = None
+        if samples * self.row_bytes > max_ram:
+            fd, self.spill_path = tempfile.mkstemp(prefix="hcr-corr-", suffix=".bin", dir=spill_dir)
+            os.close(fd)
+            self.raw = np.memmap(self.spill_path, dtype=np.uint8, mode="w+", shape=(samples, self.row_bytes))
+        else:
+            self.raw = np.empty((samples, self.row_bytes), dtype=np.uint8)
+        self.valid = np.ones((samples, len(self.regions)), dtype=bool)
+        self.times = np.zeros(samples)
+        self.count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------------------------
+    # Sampling
+    # ---------------------------
+    def sample(self, t=None):
+        """Take the next sample (one read per region, straight into the matrix row)."""
+        if self.count >= self.samples:
+            raise RuntimeError("All samples taken")
+        i = self.count
+        row = memoryview(self.raw[i])
+        for r, (s, e) in enumerate(self.regions):
+            try:
+                self.mem.readinto(s, row[self.offsets[r]:self.offsets[r + 1]])
+            except Exception:
+                self.valid[i, r] = False
+        self.times[i] = t if t is not None else time.perf_counter()
+        self.count += 1
+        return i
+
+    def start(self, rate=10.0):
+        """Take the remaining samples at `rate` Hz on a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_worker, args=(1.0 / rate,), daemon=True)
+        self._thread.start()
+
+    def _sample_worker(self, period):
+        deadline = time.perf_counter()
+        while self.count < self.samples and not self._stop.is_set():
+            self.sample()
+            deadline += period
+            self._stop.wait(max(0.0, deadline - time.perf_counter()))
+
+    def wait(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stop(self):
+        self._stop.set()
+        self.wait()
+
+    def close(self):
+        self.stop()
+        raw, self.raw = self.raw, None
+        del raw
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+
+    # ---------------------------
+    # Ranking
+    # ---------------------------
+    @property
+    def matrix(self):
+        """(samples taken x addresses) view of the raw bytes in the scan's value type (no copy)."""
+        return self.raw[:self.count].view(self.dtype)
+
+    def addr(self, col):
+        off = col * self.dtype.itemsize
+        r = bisect.bisect_right(self.offsets, off) - 1
+        return self.regions[r][0] + off - self.offsets[r]
+
+    def rank(self, mode="decreasing", signal=None, top=50, lo=None, hi=None):
+        """Best `top` addresses as [(addr, score, first value, last value)], best first.
+
+        decreasing / increasing: score = (steps in that direction - steps against it) / steps.
+        signal: Pearson correlation of each column with `signal` (one value per sample taken).
+        `lo`/`hi` bound the plausible values (every sample must lie inside).
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown ranking mode '{mode}'")
+        k = self.count
+        if k < 3:
+            raise RuntimeError("Need at least 3 samples")
+        sig = None
+        if mode == "signal":
+            sig = np.asarray(signal, dtype=np.float64)
+            if sig.shape != (k,):
+                raise ValueError(f"signal needs one value per sample ({k})")
+            sig = sig - sig.mean()
+            norm = np.sqrt(sig @ sig)
+            if not norm:
+                raise ValueError("signal is constant")
+            sig = (sig / norm).astype(np.float32)
+        # columns of regions that failed any read are out
+        bad = ~self.valid[:k].all(axis=0)
+        width = self.dtype.itemsize
+        bad_cols = [(self.offsets[r] // width, self.offsets[r + 1] // width) for r in np.flatnonzero(bad)]
+        ncols = self.row_bytes // width
+        blocks = [(c, min(c + BLOCK_COLUMNS, ncols)) for c in range(0, ncols, BLOCK_COLUMNS)]
+        job = lambda b: self._rank_block(b[0], b[1], mode, sig, top, lo, hi, bad_cols)
+        if self.workers > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hcr-corr") as pool:
+                parts = list(pool.map(job, blocks))
+        else:
+            parts = [job(b) for b in blocks]
+        best = sorted((hit for part in parts for hit in part), key=lambda h: -h[1])[:top]
+        x = self.matrix
+        return [(self.addr(col), score, x[0, col].item(), x[k - 1, col].item()) for col, score in best]
+
+    def _rank_block(self, c0, c1, mode, sig, top, lo, hi, bad_cols):
+        x = self.matrix[:, c0:c1]
+        if x.dtype != np.float32:
+            x = x.astype(np.float32)
+        ok = np.isfinite(x).all(axis=0)
+        if lo is not None:
+            ok &= (x >= lo).all(axis=0)
+        if hi is not None:
+            ok &= (x <= hi).all(axis=0)
+        for b0, b1 in bad_cols:
+            if b0 < c1 and b1 > c0:
+                ok[max(b0, c0) - c0:min(b1, c1) - c0] = False
+        if mode == "signal":
+            xc = x - x.mean(axis=0)
+            den = np.sqrt(np.einsum("ij,ij->j", xc, xc))
+            ok &= den > 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                score = (sig @ xc) / den
+        else:
+            d = np.diff(x, axis=0)
+            down = np.count_nonzero(d < 0, axis=0)
+            up = np.count_nonzero(d > 0, axis=0)
+            score = ((down - up) if mode == "decreasing" else (up - down)) / float(len(d))
+            ok &= (down + up) > 0
+        score = np.where(ok, score, -np.inf)
+        n = min(top, len(score))
+        idx = np.argpartition(-score, n - 1)[:n]
+        return [(c0 + int(i), float(score[i])) for i in idx if score[i] > -np.inf]
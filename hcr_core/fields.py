@@ -0,0 +1,54 @@
+"""
+Game constants and the field table shared by both trainers.
+"""
+
+from collections import namedtuple
+
+from .layouts import Layout
+
+GAME_PROCESS = "HillClimbRacing.exe"
+GAME_MODULE = "cocos2d-win10.dll"
+
+# ---------------------------
+# Offsets/constants from your original spec
+# ---------------------------
+COINS_OFFSET = 0x28CAD4
+DIAMONDS_OFFSET = 0x28CAEC
+FUEL_BASE_OFFSET = 0x0028CA2C
+FUEL_OFFSETS = [0x2A8]
+BOOST_BASE_OFFSET = 0x00396244
+BOOST_OFFSETS = [0x4,0x14,0x14,0x8,0x30,0xF8,0xE4]
+BOOST_SECONDARY_OFFSETS = [0x4,0x14,0x14,0x8,0x7C,0xF8,0xE4]
+BOOST_THIRD_OFFSETS = [0x4,0x14,0x14,0x8,0x8C,0xF8,0xE4]
+
+# ---------------------------
+# Field table: where each managed value lives
+# module None = the game executable; chain None = static address
+# ---------------------------
+Field = namedtuple("Field", "module offset chain code")
+
+FIELDS = {
+    "coins": Field(None, COINS_OFFSET, None, "I"),
+    "diamonds": Field(None, DIAMONDS_OFFSET, None, "I"),
+    "fuel": Field(None, FUEL_BASE_OFFSET, FUEL_OFFSETS, "f"),
+    "boost": Field(GAME_MODULE, BOOST_BASE_OFFSET, BOOST_OFFSETS, "i"),
+}
+
+# ---------------------------
+# Object layouts (one read per object, see layouts.ObjectView)
+# ---------------------------
+# Static block at game base + FUEL_BASE_OFFSET: the fuel object pointer, coins and diamonds
+# all sit within 0xC4 bytes, so one read covers the whole wallet.
+GLOBALS_OFFSET = FUEL_BASE_OFFSET
+GLOBALS = Layout("globals", [
+    ("fuel_object", 0, "I"),
+    ("coins", COINS_OFFSET - GLOBALS_OFFSET, "I"),
+    ("diamonds", DIAMONDS_OFFSET - GLOBALS_OFFSET, "I"),
+])
+
+# Object the fuel pointer points at (FUEL_OFFSETS[-1] is the fuel float inside it)
+FUEL_OBJECT = Layout("fuel_object", [("fuel", FUEL_OFFSETS[-1], "f")])
+
+# Object at the end of the boost chain (BOOST_OFFSETS[-1] is the boost count inside it;
+# the recalibration chains end on the same offset)
+BOOST_OBJECT = Layout("boost_object", [("boost", BOOST_OFFSETS[-1], "i")])
@@ -0,0 +1,150 @@
+"""
+Global hotkeys through one keyboard hook.
+- A single hook handler serves every hotkey. Chords live in a hash table keyed by the set of
+  held keys, so each key event costs one dict lookup however many hotkeys are registered.
+- Only keys that belong to some chord, plus ctrl/shift/alt/windows, are tracked: holding the
+  arrow keys to drive does not block a hotkey, and every other key event returns straight away.
+  Modifiers must match exactly, so "f" does not fire on ctrl+f.
+- add()/remove() swap in a new table (copy-on-write); the hook thread never takes a lock.
+- Callbacks run on the hook thread, or wherever `dispatch` hands them (e.g. the Tk thread).
+- Hook-to-action latency (OS event time -> callbacks done) is kept for the last events; see stats().
+"""
+
+import time
+import threading
+from array import array
+
+try:
+    import keyboard
+    KEYBOARD_AVAILABLE = True
+except Exception:
+    KEYBOARD_AVAILABLE = False
+
+LATENCY_SAMPLES = 1024
+MODIFIER_KEYS = ("ctrl", "shift", "alt", "windows")
+
+class HotkeyHub:
+    """All trainer hotkeys on one hook: add("ctrl+f", cb) -> handle, remove(handle).
+
+    `dispatch(run)`, when given, is called on the hook thread with a callable that
+    runs the chord's callbacks; latency is recorded when that callable finishes.
+    """
+    def __init__(self, kb=None, dispatch=None):
+        self.kb = kb if kb is not None else (keyboard if KEYBOARD_AVAILABLE else None)
+        self.dispatch = dispatch
+        self._table = {}            # frozenset of key ids -> tuple of (handle, callback)
+        self._alias = {}            # scan code -> key id (left/right variants share one id)
+        self._held = {}             # scan code -> key id, for tracked keys currently down
+        self._lock = threading.Lock()
+        self._hook = None
+        self._lat = array('d', bytes(8 * LATENCY_SAMPLES))
+        self.events = 0
+        self.fired = 0
+        self.errors = 0
+
+    def _chord(self, hotkey, alias):
+        """Key-id set for `hotkey`, registering new scan codes in `alias`."""
+        if self.kb is None:
+            raise RuntimeError("keyboard module not available")
+        steps = self.kb.parse_hotkey(hotkey)
+        if len(steps) != 1:
+            raise ValueError(f"Key sequences are not supported: {hotkey!r}")
+        ids = set()
+        for codes in steps[0]:
+            key_id = next((alias[c] for c in codes if c in alias), min(codes))
+            for c in codes:
+                alias.setdefault(c, key_id)
+            ids.add(key_id)
+        return frozenset(ids)
+
+    def _track_modifiers(self, alias):
+        # modifiers are always tracked so a chord only fires on an exact modifier match
+        for name in MODIFIER_KEYS:
+            try:
+                self._chord(name, alias)
+            except (ValueError, KeyError):
+                pass                            # no such key on this platform
+
+    def add(self, hotkey, callback):
+        with self._lock:
+            alias = dict(self._alias)
+            if not alias:
+                self._track_modifiers(alias)
+            chord = self._chord(hotkey, alias)
+            handle = (chord, callback)
+            table = dict(self._table)
+            table[chord] = table.get(chord, ()) + ((handle, callback),)
+            self._alias, self._table = alias, table
+            if self._hook is None:
+                self._hook = self.kb.hook(self._on_event)
+        return handle
+
+    def remove(self, handle):
+        """Remove one registration (the handle from add()); a hotkey string removes every callback on that chord."""
+        with self._lock:
+            table = dict(self._table)
+            if isinstance(handle, str):
+                chord, subs = self._chord(handle, dict(self._alias)), ()
+            else:
+                chord = handle[0]
+                subs = tuple(s for s in table.get(chord, ()) if s[0] is not handle)
+            if subs:
+                table[chord] = subs
+            else:
+                table.pop(chord, None)
+            self._table = table
+
+    def clear(self):
+        with self._lock:
+            self._table = {}
+
+    def stop(self):
+        with self._lock:
+            self._table = {}
+            if self._hook is not None:
+                try:
+                    self.kb.unhook(self._hook)
+                except Exception:
+                    pass
+                self._hook = None
+
+    def _on_event(self, ev):
+        self.events += 1
+        code = ev.scan_code
+        key_id = self._alias.get(code)
+        if key_id is None:
+            return                              # neither a modifier nor part of any hotkey
+        held = self._held
+        if ev.event_type != "down":
+            held.pop(code, None)
+            return
+        if code in held:
+            return                              # auto-repeat while held
+        held[code] = key_id
+        subs = self._table.get(frozenset(held.values()))
+        if not subs:
+            return
+        t = getattr(ev, "time", None)
+        if self.dispatch is None:
+            self._run(subs, t)
+        else:
+            self.dispatch(lambda: self._run(subs, t))
+
+    def _run(self, subs, t):
+        for _, callback in subs:
+            try:
+                callback()
+            except Exception:
+                self.errors += 1
+        if t:
+            self._lat[self.fired % LATENCY_SAMPLES] = time.time() - t
+        self.fired += 1
+
+    def stats(self):
+        """Hook-to-action latency over the last fired hotkeys: {count, p50_ms, p99_ms, max_ms}."""
+        n = min(self.fired, LATENCY_SAMPLES)
+        lat = sorted(self._lat[:n])
+        if not lat:
+            return {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        return {"count": self.fired, "p50_ms": lat[n // 2] * 1e3,
+                "p99_ms": lat[min(n - 1, int(n * 0.99))] * 1e3, "max_ms": lat[-1] * 1e3}
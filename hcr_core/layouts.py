@@ -0,0 +1,88 @@
+"""
+Object layouts: read a whole game object in one read, decode every field at once,
+write back only what changed.
+"""
+
+import struct
+
+class Layout:
+    """Named fields at fixed offsets inside one object: Layout("fuel_object", [("fuel", 0x2A8, "f")]).
+
+    All fields are decoded by a single precompiled struct (gaps become pad
+    bytes), so reading N fields is one unpack_from call on the shared buffer.
+    """
+    def __init__(self, name, fields, size=None):
+        self.name = name
+        ordered = sorted(fields, key=lambda f: f[1])
+        self.fields = {n: (off, struct.Struct('<' + code)) for n, off, code in ordered}
+        end = max(off + st.size for off, st in self.fields.values())
+        self.size = size or end
+        if self.size < end:
+            raise ValueError(f"Layout {name}: size {self.size} is smaller than its fields ({end})")
+        fmt, pos = '<', 0
+        for n, off, code in ordered:
+            if off < pos:
+                raise ValueError(f"Layout {name}: field '{n}' overlaps the previous field")
+            fmt += (f"{off - pos}x" if off > pos else "") + code
+            pos = off + struct.calcsize('<' + code)
+        self._all = struct.Struct(fmt)
+        self.names = tuple(n for n, _, _ in ordered)
+
+    def decode(self, buf):
+        """{field: value} for every field of `buf` (one unpack call)."""
+        return dict(zip(self.names, self._all.unpack_from(buf, 0)))
+
+class ObjectView:
+    """A local copy of one object in the target.
+
+    read() pulls the whole object with a single readinto; item access decodes
+    from the buffer without copying; assignments only touch the buffer and
+    mark the field dirty until write_dirty() sends the changed fields, with
+    adjacent or overlapping ones merged into one write.
+    """
+    def __init__(self, mem, layout, addr):
+        self.mem = mem
+        self.layout = layout
+        self.addr = int(addr)
+        self.buf = bytearray(layout.size)
+        self._dirty = []
+
+    def read(self):
+        self.mem.readinto(self.addr, self.buf)
+        self._dirty.clear()
+        return self
+
+    def __getitem__(self, name):
+        off, st = self.layout.fields[name]
+        return st.unpack_from(self.buf, off)[0]
+
+    def __setitem__(self, name, value):
+        off, st = self.layout.fields[name]
+        st.pack_into(self.buf, off, value)
+        self._dirty.append((off, off + st.size))
+
+    def values(self):
+        return self.layout.decode(self.buf)
+
+    def field_addr(self, name):
+        """Address of field `name` in the target."""
+        return self.addr + self.layout.fields[name][0]
+
+    def dirty_runs(self):
+        """Dirty byte ranges merged by adjacency: [(start, end), ...]."""
+        runs = []
+        for start, end in sorted(self._dirty):
+            if runs and start <= runs[-1][1]:
+                runs[-1] = (runs[-1][0], max(runs[-1][1], end))
+            else:
+                runs.append((start, end))
+        return runs
+
+    def write_dirty(self):
+        """Write every dirty run back; returns the number of writes issued."""
+        runs = self.dirty_runs()
+        view = memoryview(self.buf)
+        for start, end in runs:
+            self.mem.write_bytes(self.addr + start, bytes(view[start:end]))
+        self._dirty.clear()
+        return len(runs)
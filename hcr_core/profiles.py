@@ -0,0 +1,176 @@
+"""
+Profile store: config.json settings plus lazily loaded named profiles.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+# ---------------------------
+# Profile store (config.json settings + one lazily loaded file per profile)
+# ---------------------------
+CONFIG_PATH = "config.json"
+PROFILES_DIR = "profiles"
+
+PROFILE_KEYS = ("coin", "diamond", "fuel", "boost", "fuel_auto", "hotkeys")
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file next to `path`, fsync, then os.replace over it."""
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            json.dump(data, fh, indent=2)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+class ProfileStore:
+    """Named profiles kept in memory, saved debounced and atomically on a background thread.
+
+    config.json holds the shared settings (game, module, active profile).
+    Each profile lives in profiles/<name>.json and is parsed only on first use,
+    so a library of hundreds of profiles costs one directory listing at startup.
+    A legacy single-profile config.json is picked up as the "default" profile.
+    """
+    def __init__(self, config_path=CONFIG_PATH, profiles_dir=PROFILES_DIR, debounce=0.5):
+        self.config_path = config_path
+        self.profiles_dir = profiles_dir
+        self.debounce = debounce
+        self.settings = {}
+        self._cache = {}            # name -> dict, only for profiles touched so far
+        self._names = set()
+        self._dirty = set()         # profile names, or None for config.json
+        self._due = 0.0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()     # taking and writing a batch is one step: batches land in order
+        self._worker = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.config_path, "r") as fh:
+                self.settings = json.load(fh)
+        except (OSError, ValueError):
+            self.settings = {}
+        legacy = {k: self.settings.pop(k) for k in PROFILE_KEYS if k in self.settings}
+        try:
+            self._names = {e.name[:-5] for e in os.scandir(self.profiles_dir) if e.name.endswith(".json") and not e.name.startswith(".")}
+        except OSError:
+            self._names = set()
+        self.settings.setdefault("active_profile", "default")
+        if legacy and "default" not in self._names:
+            self._names.add("default")
+            self._cache["default"] = legacy
+            with self._cond:
+                self._dirty.update(("default", None))
+                self._kick()
+
+    def _profile_path(self, name):
+        return os.path.join(self.profiles_dir, f"{name}.json")
+
+    @property
+    def active(self):
+        return self.settings["active_profile"]
+
+    def names(self):
+        with self._cond:
+            return sorted(self._names)
+
+    def get(self, name):
+        """Return profile `name` (empty dict if it does not exist)."""
+        with self._cond:
+            if name not in self._names:
+                return {}           # also covers a deleted profile (cached as None until its file is gone)
+            if name in self._cache:
+                return self._cache[name]
+        try:
+            with open(self._profile_path(name), "r") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            data = {}
+        with self._cond:
+            return self._cache.setdefault(name, data)
+
+    def put(self, name, data):
+        if not name or any(c in name for c in '/\\:*?"<>|'):
+            raise ValueError(f"Invalid profile name: {name!r}")
+        with self._cond:
+            self._cache[name] = dict(data)
+            self._names.add(name)
+            self._dirty.add(name)
+            self._kick()
+
+    def delete(self, name):
+        with self._cond:
+            self._cache[name] = None
+            self._names.discard(name)
+            self._dirty.add(name)
+            self._kick()
+
+    def update_settings(self, **kw):
+        with self._cond:
+            self.settings.update(kw)
+            self._dirty.add(None)
+            self._kick()
+
+    def _kick(self):
+        # caller holds self._cond
+        self._due = time.monotonic() + self.debounce
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._save_worker, daemon=True)
+            self._worker.start()
+        self._cond.notify()
+
+    def _take_dirty(self):
+        # caller holds self._cond; serialize under the lock, write outside it
+        dirty, self._dirty = self._dirty, set()
+        jobs = []
+        for key in dirty:
+            if key is None:
+                jobs.append((self.config_path, json.loads(json.dumps(self.settings))))
+            else:
+                data = self._cache.get(key)
+                jobs.append((self._profile_path(key), None if data is None else json.loads(json.dumps(data))))
+        return jobs
+
+    def _write(self, jobs):
+        for path, data in jobs:
+            try:
+                if data is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    atomic_write_json(path, data)
+            except Exception as e:
+                print(f"Profile save failed for {path}: {e}", file=sys.stderr)
+
+    def _save_worker(self):
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self._cond.wait()
+                while True:
+                    wait = self._due - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._write_lock:
+            with self._cond:
+                jobs = self._take_dirty()
+            self._write(jobs)
+
+    def flush(self):
+        """Write anything pending right now (call on exit); waits for a save already in progress."""
+        self._write_pending()
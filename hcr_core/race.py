@@ -0,0 +1,110 @@
+"""
+Race start / end detection from the fuel pointer chain.
+"""
+
+import sys
+import math
+import time
+import threading
+
+# ---------------------------
+# Race detector (fuel pointer validity -> race start / end)
+# ---------------------------
+FUEL_MAX = 100.0
+
+class RaceDetector:
+    """Polls the fuel pointer chain and reports race start / end.
+
+    A race is "on" once every hop of base -> offsets is a plausible pointer,
+    the hop values stay identical for `settle` seconds and the fuel float is
+    finite and within 0..FUEL_MAX. It is "off" as soon as a hop changes, or
+    once the chain is null or unreadable for `grace` polls in a row. The fuel
+    value is not checked during a race (a fuel freeze may hold it above
+    FUEL_MAX). Hops are followed strictly (no `resolve_pointer`-style
+    fallback), so nothing is ever reported for a stale address. Each poll
+    costs len(offsets) + 1 small reads.
+    """
+    def __init__(self, mem, base_addr, offsets, on_start, on_end, rate=200, settle=0.02, grace=3):
+        self.mem = mem
+        self.base_addr = int(base_addr)
+        self.offsets = list(offsets)
+        self.on_start = on_start    # called with the fuel address, on the detector thread
+        self.on_end = on_end
+        self.rate = rate
+        self.settle = settle
+        self.grace = grace
+        self.in_race = False
+        self.fuel_addr = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll_worker, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop polling; with `timeout`, give up waiting for a callback that is still running."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def chain(self):
+        """Return (hops, fuel_addr) if every hop is a plausible pointer, else None."""
+        cur, hops = self.base_addr, []
+        for off in self.offsets:
+            val = self.mem.read_uint(cur)
+            if val < 0x10000 or val & 3:
+                return None
+            hops.append(val)
+            cur = val + off
+        return tuple(hops), cur
+
+    def probe(self):
+        """Return (hops, fuel_addr) if the chain looks like a live race, else None."""
+        seen = self.chain()
+        if seen is None:
+            return None
+        hops, cur = seen
+        fuel = self.mem.read_float(cur)
+        if not (math.isfinite(fuel) and 0.0 <= fuel <= FUEL_MAX):
+            return None
+        return tuple(hops), cur
+
+    def _poll_worker(self):
+        period = 1.0 / self.rate
+        candidate, since, bad = None, 0.0, 0
+        while not self._stop.wait(period):
+            try:
+                # during a race only the hops matter; the fuel value is whatever a freeze holds
+                seen = self.chain() if self.in_race else self.probe()
+            except Exception:
+                seen = None
+            now = time.perf_counter()
+            if self.in_race:
+                if seen is not None and seen[0] == candidate:
+                    bad = 0
+                    continue
+                bad += 1
+                # a moved pointer is final straight away; a null/unreadable chain gets `grace` polls
+                if seen is not None or bad >= self.grace:
+                    self.in_race, self.fuel_addr, candidate = False, None, None
+                    self._fire(self.on_end)
+                continue
+            if seen is None:
+                candidate = None
+                continue
+            if seen[0] != candidate:
+                candidate, since = seen[0], now
+            elif now - since >= self.settle:
+                self.in_race, self.fuel_addr, bad = True, seen[1], 0
+                self._fire(self.on_start, seen[1])
+
+    def _fire(self, cb, *args):
+        try:
+            cb(*args)
+        except Exception as e:
+            print(f"Race callback failed: {e}", file=sys.stderr)
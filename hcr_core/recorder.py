@@ -0,0 +1,214 @@
+"""
+Fixed-rate value recorder and its columnar file format.
+"""
+
+import os
+import gc
+import json
+import time
+import queue
+import struct
+import threading
+from array import array
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+from .memory import plan_reads, span_buffers
+
+# ---------------------------
+# Value recorder (fixed-rate sampling into ring buffers, columnar file)
+# ---------------------------
+RECORD_FIELDS = (("coins", "I"), ("diamonds", "I"), ("fuel", "f"), ("boost", "i"))
+RECORD_MAGIC = b"HCRREC1\n"
+RECORDINGS_DIR = "recordings"
+
+class ValueRecorder:
+    """Samples coins/diamonds/fuel/boost at `rate` Hz.
+
+    Samples land in preallocated `array` columns used as a ring buffer. Each
+    time half the ring fills, that half is snapshotted and handed to a
+    background writer that appends it as one columnar block:
+        uint32 count, then each column's raw bytes (time 'd', valid 'B', fields...)
+    """
+    def __init__(self, mem, addrs, path, rate=60, capacity=4096, watcher=None):
+        self.mem = mem
+        self.watcher = watcher          # when given, sample its latest values instead of reading
+        self.addrs = addrs              # name -> address (None = not recorded)
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity - capacity % 2
+        self.half = self.capacity // 2
+        self.columns = [("t", "d"), ("valid", "B")] + list(RECORD_FIELDS)
+        self.data = [array(tc, bytes(self.capacity * array(tc).itemsize)) for _, tc in self.columns]
+        self._layout = self._build_layout(addrs)
+        self._handles = {}              # name -> watcher handle while running
+        self._lock = threading.Lock()   # retarget() vs start() / stop()
+        self.samples = 0
+        self.overruns = 0
+        self.max_lateness = 0.0
+        self._stop = threading.Event()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._writer = None
+
+    def _build_layout(self, addrs):
+        """(plan, span buffers, decode rows, watched addresses) for one set of field addresses."""
+        plan = plan_reads([addrs.get(name) for name, _ in RECORD_FIELDS])
+        decode = []                     # (column, span, offset, struct, valid bit)
+        if self.watcher is not None:
+            # shared read stream: each sample takes the watcher's latest raw bytes per field
+            # (None while the watcher's reads there fail, so the field is recorded as invalid)
+            decode = [(self.data[idx + 2], idx, 0, struct.Struct('<' + tc), 1 << idx)
+                      for idx, (name, tc) in enumerate(RECORD_FIELDS) if addrs.get(name)]
+        else:
+            for span_idx, (_, _, members) in enumerate(plan):
+                for idx, off in members:
+                    decode.append((self.data[idx + 2], span_idx, off, struct.Struct('<' + RECORD_FIELDS[idx][1]), 1 << idx))
+        return plan, span_buffers(plan), decode, [addrs.get(name) for name, _ in RECORD_FIELDS]
+
+    def retarget(self, addrs):
+        """Move fields to new addresses while recording (name -> address, None = not recorded).
+
+        Used for pointer fields whose object is replaced, e.g. fuel on race start / end.
+        """
+        with self._lock:
+            new = dict(self.addrs)
+            new.update(addrs)
+            if self.watcher is not None and self._thread is not None and not self._stop.is_set():
+                for name in addrs:
+                    if new.get(name) == self.addrs.get(name):
+                        continue
+                    handle = self._handles.pop(name, None)
+                    if handle:
+                        self.watcher.unwatch(handle)
+                    if new.get(name):
+                        self._handles[name] = self.watcher.watch(new[name], 4, self._on_watch)
+            self.addrs = new
+            # the sample loop picks this up on its next tick
+            self._layout = self._build_layout(new)
+
+    def start(self):
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        header = json.dumps({"rate": self.rate, "start": time.time(), "columns": self.columns}).encode()
+        with open(self.path, "wb") as fh:
+            fh.write(RECORD_MAGIC + struct.pack('<I', len(header)) + header)
+        self._stop.clear()
+        with self._lock:
+            if self.watcher is not None:
+                for name, _ in RECORD_FIELDS:
+                    if self.addrs.get(name):
+                        self._handles[name] = self.watcher.watch(self.addrs[name], 4, self._on_watch)
+            self._writer = threading.Thread(target=self._writer_worker, daemon=True)
+            self._thread = threading.Thread(target=self._sample_worker, daemon=True)
+        self._writer.start()
+        self._thread.start()
+
+    def _on_watch(self, ev):
+        pass                            # subscribed only to keep the field polled; see _sample_worker
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        with self._lock:
+            for handle in self._handles.values():
+                self.watcher.unwatch(handle)
+            self._handles = {}
+        self._queue.put(None)
+        if self._writer:
+            self._writer.join()
+
+    def _sample_worker(self):
+        period = 1.0 / self.rate
+        t_col, valid_col = self.data[0], self.data[1]
+        read_spans = self.mem.read_spans
+        if self.watcher is not None:
+            latest = self.watcher.latest
+        # move everything alive now out of the collector's way for the whole run
+        gc.collect()
+        gc.freeze()
+        try:
+            t0 = time.perf_counter()
+            deadline = t0
+            i = chunk_start = 0
+            while not self._stop.is_set():
+                now = time.perf_counter()
+                if deadline > now:
+                    time.sleep(deadline - now)
+                    now = time.perf_counter()
+                late = now - deadline
+                if late > self.max_lateness:
+                    self.max_lateness = late
+                plan, span_bufs, decode, watched = self._layout
+                if self.watcher is not None:
+                    bufs = [addr and latest(addr, 4) for addr in watched]
+                else:
+                    bufs = read_spans(plan, span_bufs)
+                valid = 0
+                for col, span, off, st, bit in decode:
+                    buf = bufs[span]
+                    if buf is not None:
+                        col[i] = st.unpack_from(buf, off)[0]
+                        valid |= bit
+                t_col[i] = now - t0
+                valid_col[i] = valid
+                i += 1
+                self.samples += 1
+                if i - chunk_start == self.half:
+                    self._queue.put(self._snapshot(chunk_start, i))
+                    chunk_start = i % self.capacity
+                    i = chunk_start
+                deadline += period
+                if now - deadline > period:
+                    # fell more than a sample behind: skip ahead rather than burst
+                    missed = int((now - deadline) / period)
+                    self.overruns += missed
+                    deadline += missed * period
+            if i > chunk_start:
+                self._queue.put(self._snapshot(chunk_start, i))
+        finally:
+            gc.unfreeze()
+
+    def _snapshot(self, start, end):
+        return end - start, [memoryview(col)[start:end].tobytes() for col in self.data]
+
+    def _writer_worker(self):
+        with open(self.path, "ab") as fh:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                count, cols = item
+                fh.write(struct.pack('<I', count))
+                for raw in cols:
+                    fh.write(raw)
+                fh.flush()
+
+def load_recording(path):
+    """Load a recorder file; returns (meta, {column: array}) (numpy arrays when available)."""
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    if not raw.startswith(RECORD_MAGIC):
+        raise ValueError(f"{path} is not a trainer recording")
+    pos = len(RECORD_MAGIC)
+    (hlen,) = struct.unpack_from('<I', raw, pos)
+    pos += 4
+    meta = json.loads(raw[pos:pos + hlen])
+    pos += hlen
+    cols = {name: array(tc) for name, tc in meta["columns"]}
+    while pos + 4 <= len(raw):
+        (count,) = struct.unpack_from('<I', raw, pos)
+        pos += 4
+        for name, tc in meta["columns"]:
+            n = count * cols[name].itemsize
+            cols[name].frombytes(raw[pos:pos + n])
+            pos += n
+    if NUMPY_AVAILABLE:
+        cols = {name: np.frombuffer(col, dtype=col.typecode) for name, col in cols.items()}
+    return meta, cols
@@ -0,0 +1,283 @@
+"""
+Value scanner (first scan / next scan) over MemHelper.
+- Every pass keeps a crc32 per page. A next scan still reads the candidate pages, but only
+  pages whose checksum moved are decoded and compared again: on an unchanged page no
+  verdict can change, so its candidates are kept or dropped as a block.
+- An unknown-value first scan keeps a page snapshot instead of a candidate list.
+- Large passes are split across a process pool; each worker opens its own handle.
+
+    sc = Scanner(session.mem, "f")
+    sc.first_scan()                  # unknown initial value
+    sc.next_scan("decreased")        # ... after burning some fuel
+    sc.next_scan("unchanged")
+    sc.results()                     # [(addr, value), ...]
+"""
+
+import os
+import sys
+import zlib
+import time
+import struct
+import multiprocessing
+from array import array
+from collections import namedtuple
+
+from .memory import open_native_backend
+
+PAGE = 0x1000
+RUN_MAX = 0x100000          # pages read back to back are fetched in one read of up to 1 MiB
+POOL_MIN_PAGES = 4096       # 16 MiB: below this a pool costs more than it saves
+OPS = ("eq", "ne", "changed", "unchanged", "increased", "decreased")
+
+# struct code -> array typecode of the same width
+_TYPECODES = {"b": "b", "B": "B", "h": "h", "H": "H", "i": "i", "I": "I", "q": "q", "Q": "Q", "f": "f", "d": "d"}
+
+ScanStats = namedtuple("ScanStats", "pages skipped decoded found seconds")
+
+# ---------------------------
+# One pass over a list of pages (runs in-process or in a pool worker)
+# ---------------------------
+# Page state: (crc, offs, vals)
+#   offs None  -> every aligned slot is still a candidate, vals is the page snapshot (bytes)
+#   otherwise  -> offs is array('H') of byte offsets, vals the matching array of values
+def _as_array(tc, data):
+    a = array(tc)
+    a.frombytes(data)
+    if sys.byteorder == "big":
+        a.byteswap()        # the target is little-endian
+    return a
+
+def _find(data, needle, size):
+    offs, i = array("H"), data.find(needle)
+    while i != -1:
+        if i % size == 0:
+            offs.append(i)
+        i = data.find(needle, i + 1)
+    return offs
+
+def _keep(op, olds, news, target):
+    pairs = enumerate(zip(olds, news))
+    if op == "eq":
+        return [i for i, b in enumerate(news) if b == target]
+    if op == "ne":
+        return [i for i, b in enumerate(news) if b != target]
+    if op == "changed":
+        return [i for i, (a, b) in pairs if a != b]
+    if op == "unchanged":
+        return [i for i, (a, b) in pairs if a == b]
+    if op == "increased":
+        return [i for i, (a, b) in pairs if b > a]
+    return [i for i, (a, b) in pairs if b < a]
+
+def _runs(pages):
+    """Group sorted page addresses into (start, count) runs of consecutive pages."""
+    per_run = RUN_MAX // PAGE
+    start = prev = None
+    for p in pages:
+        if start is not None and p == prev + PAGE and (p - start) // PAGE < per_run:
+            prev = p
+            continue
+        if start is not None:
+            yield start, (prev - start) // PAGE + 1
+        start = prev = p
+    if start is not None:
+        yield start, (prev - start) // PAGE + 1
+
+def _scan_pages(readinto, pages, prev, code, op, value, use_crc):
+    """Returns ({page: state} for pages that keep candidates, skipped, decoded)."""
+    st = struct.Struct('<' + code)
+    size, tc, unpack_from = st.size, _TYPECODES[code], st.unpack_from
+    needle = None if value is None else st.pack(value)
+    target = None if value is None else st.unpack(needle)[0]
+    out = {}
+    counts = [0, 0]     # skipped, decoded
+
+    def visit(page, mv):
+        crc = zlib.crc32(mv)
+        if prev is None:                        # first scan
+            if value is None:
+                out[page] = (crc, None, bytes(mv))
+                return
+            offs = _find(bytes(mv), needle, size)
+            if offs:
+                out[page] = (crc, offs, array(tc, [target]) * len(offs))
+            return
+        old_crc, offs, vals = prev[page]
+        same = use_crc and crc == old_crc
+        if same:
+            counts[0] += 1
+            if op == "unchanged":
+                out[page] = prev[page]
+                return
+            if op != "eq" and op != "ne":
+                return                          # nothing on this page changed
+        else:
+            counts[1] += 1
+        if op == "eq" and offs is None:
+            found = _find(bytes(mv), needle, size)
+            if found:
+                out[page] = (crc, found, array(tc, [target]) * len(found))
+            return
+        if offs is None:
+            olds, news = _as_array(tc, vals), _as_array(tc, mv)
+            idx = _keep(op, olds, news, target)
+            kept = array("H", [i * size for i in idx])
+        else:
+            olds = vals
+            news = vals if same else [unpack_from(mv, o)[0] for o in offs]
+            idx = _keep(op, olds, news, target)
+            kept = array("H", [offs[i] for i in idx])
+        if idx:
+            out[page] = (crc, kept, array(tc, [news[i] for i in idx]))
+
+    buf = bytearray(RUN_MAX)
+    view = memoryview(buf)
+    for start, n in _runs(pages):
+        try:
+            readinto(start, view[:n * PAGE])
+        except Exception:
+            # part of the run went away: keep whatever pages still read
+            for k in range(n):
+                try:
+                    readinto(start + k * PAGE, view[:PAGE])
+                except Exception:
+                    continue
+                visit(start + k * PAGE, view[:PAGE])
+            continue
+        for k in range(n):
+            visit(start + k * PAGE, view[k * PAGE:(k + 1) * PAGE])
+    return out, counts[0], counts[1]
+
+# ---------------------------
+# Pool workers
+# ---------------------------
+_fork_io = None         # backend inherited by forked workers (the simulated heap)
+_worker_io = None
+
+def _init_worker(pid):
+    global _worker_io
+    _worker_io = _fork_io if pid is None else open_native_backend(pid)
+
+def _pool_scan(args):
+    pages, prev, code, op, value, use_crc = args
+    return _scan_pages(_worker_io.readinto, pages, prev, code, op, value, use_crc)
+
+def _split(pages, parts):
+    step = max(1, -(-len(pages) // parts))
+    return [pages[i:i + step] for i in range(0, len(pages), step)]
+
+# ---------------------------
+# Scanner
+# ---------------------------
+class Scanner:
+    """First scan / next scan for one value type (struct code) over the readable memory in [lo, hi)."""
+    def __init__(self, mem, code="i", lo=0, hi=None, workers=None, pool_min_pages=POOL_MIN_PAGES, checksums=True):
+        if code not in _TYPECODES:
+            raise ValueError(f"Unsupported value type '{code}'")
+        self.mem = mem
+        self.code = code
+        self.size = struct.calcsize('<' + code)
+        self.lo = lo & ~(PAGE - 1)
+        self.hi = None if hi is None else -(-hi // PAGE) * PAGE
+        self.workers = workers or os.cpu_count() or 1
+        self.pool_min_pages = pool_min_pages
+        self.checksums = checksums      # False: re-decode every page every pass (for comparison)
+        self.last = None                # ScanStats of the latest pass
+        self._pages = None
+        self._pool = None
+
+    def first_scan(self, value=None):
+        """Scan everything; value=None is an unknown initial value (snapshot). Returns the hit count."""
+        rmap = self.mem.region_map
+        if rmap is None:
+            raise RuntimeError("Backend can't list memory regions")
+        rmap.refresh()
+        pages = [p for s, e in rmap.readable_regions(self.lo, self.hi) for p in range(s & ~(PAGE - 1), e, PAGE)]
+        return self._run(pages, None, "eq", value)
+
+    def next_scan(self, op, value=None):
+        """Narrow the candidates: op is one of OPS ("eq"/"ne" take a value). Returns the hit count."""
+        if self._pages is None:
+            raise RuntimeError("No first scan yet")
+        if op not in OPS:
+            raise ValueError(f"Unknown scan op '{op}'")
+        if op in ("eq", "ne") and value is None:
+            raise ValueError(f"'{op}' needs a value")
+        return self._run(sorted(self._pages), self._pages, op, value)
+
+    @property
+    def count(self):
+        if not self._pages:
+            return 0
+        per_page = PAGE // self.size
+        return sum(per_page if offs is None else len(offs) for _, offs, _ in self._pages.values())
+
+    def results(self, limit=1000):
+        """[(addr, value)] of the current candidates, lowest address first."""
+        out = []
+        unpack_from = struct.Struct('<' + self.code).unpack_from
+        for page in sorted(self._pages or ()):
+            _, offs, vals = self._pages[page]
+            if offs is None:
+                offs = range(0, PAGE - self.size + 1, self.size)
+                vals = [unpack_from(vals, o)[0] for o in offs]
+            for o, v in zip(offs, vals):
+                if len(out) >= limit:
+                    return out
+                out.append((page + o, v))
+        return out
+
+    def reset(self):
+        self._pages = None
+        self.last = None
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def _run(self, pages, prev, op, value):
+        t0 = time.perf_counter()
+        result = None
+        if self.workers > 1 and len(pages) >= self.pool_min_pages:
+            result = self._pool_pass(pages, prev, op, value)
+        if result is None:
+            result = _scan_pages(self.mem.readinto, pages, prev, self.code, op, value, self.checksums)
+        self._pages, skipped, decoded = result
+        self.last = ScanStats(len(pages), skipped, decoded, self.count, time.perf_counter() - t0)
+        return self.last.found
+
+    def _pool_pass(self, pages, prev, op, value):
+        """Split the pages across worker processes; None when no pool can be used here."""
+        global _fork_io
+        io = self.mem.io
+        inherit = io is not None and io.name == "sim"
+        if inherit:
+            # the simulated heap only exists in this process: fork a fresh pool that sees it as it is now
+            if "fork" not in multiprocessing.get_all_start_methods():
+                return None
+            _fork_io = io
+            pool = multiprocessing.get_context("fork").Pool(self.workers, _init_worker, (None,))
+        else:
+            if not self.mem.pid:
+                return None
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.workers, _init_worker, (self.mem.pid,))
+            pool = self._pool
+        jobs = [(c, None if prev is None else {p: prev[p] for p in c}, self.code, op, value, self.checksums)
+                for c in _split(pages, self.workers * 4)]
+        try:
+            parts = pool.map(_pool_scan, jobs)
+        except Exception:
+            self.close()
+            return None
+        finally:
+            if inherit:
+                pool.terminate()
+                _fork_io = None
+        merged, skipped, decoded = {}, 0, 0
+        for states, s, d in parts:
+            merged.update(states)
+            skipped += s
+            decoded += d
+        return merged, skipped, decoded
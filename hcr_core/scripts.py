@@ -0,0 +1,311 @@
+"""
+JSON step-list scripts run on a single event-loop thread.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import queue
+import struct
+import threading
+
+# ---------------------------
+# Scripts: JSON step lists run on one event-loop thread with a timer wheel
+# ---------------------------
+SCRIPTS_DIR = "scripts"
+
+# Step forms (a script is a JSON list of steps; nothing is eval'd):
+#   {"wait": 2.5}                                   sleep seconds
+#   {"wait_for": "race_start"}                      block until engine.emit(name)
+#   {"wait_until": "fuel", "min": 1, "max": 100}    poll a field until in range
+#   {"set": "coins", "value": 1000000}              write a field
+#   {"add": "coins", "value": 1000000}              read-modify-write a field
+#   {"freeze": "fuel", "value": 100.0} / {"unfreeze": "fuel"}
+#   {"repeat": 10, "every": 5, "steps": [...]}      "repeat": null = forever
+#   {"log": "text"}
+SCRIPT_STEPS = ("wait", "wait_for", "wait_until", "set", "add", "freeze", "unfreeze", "repeat", "log")
+
+def validate_script(steps):
+    if not isinstance(steps, list):
+        raise ValueError("A script must be a JSON list of steps.")
+    for step in steps:
+        kind = next((k for k in SCRIPT_STEPS if isinstance(step, dict) and k in step), None)
+        if kind is None:
+            raise ValueError(f"Unknown script step: {step!r}")
+        if kind == "repeat":
+            validate_script(step.get("steps"))
+    return steps
+
+class TimerWheel:
+    """Hashed timing wheel: O(1) schedule, O(items due) per tick."""
+    def __init__(self, tick=0.01, slots=512):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.cursor = 0
+        self.count = 0
+
+    def schedule(self, delay, item):
+        ticks = max(1, int(math.ceil(delay / self.tick)))
+        rounds, offset = divmod(ticks - 1, len(self.slots))
+        self.slots[(self.cursor + 1 + offset) % len(self.slots)].append([rounds, item])
+        self.count += 1
+
+    def advance(self):
+        """Move one tick forward and return the items that are due."""
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        slot = self.slots[self.cursor]
+        if not slot:
+            return []
+        due, keep = [], []
+        for entry in slot:
+            if entry[0] == 0:
+                due.append(entry[1])
+            else:
+                entry[0] -= 1
+                keep.append(entry)
+        self.slots[self.cursor] = keep
+        self.count -= len(due)
+        return due
+
+class ScriptEngine:
+    """Runs any number of scripts as generators on a single thread.
+
+    `fields` maps a name to (address resolver, struct code); reads and writes
+    go through the MemHelper, freezes through the shared ChangeWatcher. Frozen
+    fields are re-resolved on every emitted event, so a fuel freeze follows
+    the fuel object from race to race and never writes into a freed one.
+    """
+    def __init__(self, mem, fields, watcher, log=None):
+        self.mem = mem
+        self.fields = fields
+        self.watcher = watcher
+        self.log = log or (lambda name, msg: print(f"[{name}] {msg}"))
+        self.wheel = TimerWheel()
+        self._inbox = queue.Queue()
+        self._waiting = {}          # event name -> [script, ...]
+        self._running = {}          # script name -> generator
+        self._freezes = {}          # (script name, field) -> [address or None, watch handle or None, hold]
+        self._thread = None
+        self._thread_lock = threading.Lock()    # _post runs on the Tk and detector threads
+
+    # public API (any thread)
+    def run(self, name, steps):
+        validate_script(steps)
+        self._post(("run", name, steps))
+
+    def cancel(self, name):
+        self._post(("cancel", name, None))
+
+    def emit(self, event):
+        self._post(("emit", event, None))
+
+    def stop(self, timeout=None):
+        """Quit the event loop; with `timeout`, give up waiting for a step that is still running."""
+        self._post(("quit", None, None))
+        with self._thread_lock:
+            if self._thread:
+                self._thread.join(timeout)
+                if not self._thread.is_alive():
+                    self._thread = None
+
+    def running(self):
+        return sorted(self._running)
+
+    def _post(self, msg):
+        self._inbox.put(msg)
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, daemon=True)
+                    self._thread.start()
+
+    # event loop
+    def _loop(self):
+        tick = self.wheel.tick
+        next_tick = time.perf_counter() + tick
+        while True:
+            # sleep until the next tick, or indefinitely when nothing is scheduled
+            timeout = max(0.0, next_tick - time.perf_counter()) if self.wheel.count else None
+            try:
+                msg = self._inbox.get(timeout=timeout)
+            except queue.Empty:
+                msg = None
+            while msg is not None:
+                if msg[0] == "quit":
+                    for name in list(self._running):
+                        self._finish(name)
+                    return
+                self._handle(msg)
+                try:
+                    msg = self._inbox.get_nowait()
+                except queue.Empty:
+                    msg = None
+            now = time.perf_counter()
+            if not self.wheel.count:
+                next_tick = now + tick
+                continue
+            while next_tick <= now:
+                next_tick += tick
+                for name, gen in self.wheel.advance():
+                    self._step(name, gen)
+
+    def _handle(self, msg):
+        kind, arg, steps = msg
+        if kind == "run":
+            if arg in self._running:
+                self._finish(arg)
+            gen = self._running[arg] = self._interpret(arg, steps)
+            self._step(arg, gen)
+        elif kind == "cancel":
+            self._finish(arg)
+        elif kind == "emit":
+            # events like race_start / race_end replace pointer-field objects
+            self._retarget_freezes()
+            for name, gen in self._waiting.pop(arg, []):
+                self._step(name, gen)
+
+    def _step(self, name, gen):
+        if self._running.get(name) is not gen:
+            return              # cancelled or replaced since it was scheduled
+        try:
+            what, arg = next(gen)
+        except StopIteration:
+            self._finish(name)
+            return
+        except Exception as e:
+            self.log(name, f"stopped: {e}")
+            self._finish(name)
+            return
+        if what == "sleep":
+            self.wheel.schedule(arg, (name, gen))
+        else:
+            self._waiting.setdefault(arg, []).append((name, gen))
+
+    def _finish(self, name):
+        gen = self._running.pop(name, None)
+        if gen is not None:
+            gen.close()
+        for event, waiters in self._waiting.items():
+            self._waiting[event] = [w for w in waiters if w[1] is not gen]
+        for key in [k for k in self._freezes if k[0] == name]:
+            self._unfreeze(key)
+        # a cancelled script may still sit in the wheel; _step ignores it
+
+    # interpreter: yields ("sleep", seconds) or ("event", name)
+    def _interpret(self, name, steps):
+        for step in steps:
+            if "wait" in step:
+                yield ("sleep", float(step["wait"]))
+            elif "wait_for" in step:
+                yield ("event", step["wait_for"])
+            elif "wait_until" in step:
+                lo, hi = step.get("min", float("-inf")), step.get("max", float("inf"))
+                poll = float(step.get("poll", 0.05))
+                while True:
+                    try:
+                        v = self._read(step["wait_until"])
+                        if lo <= v <= hi:
+                            break
+                    except Exception:
+                        pass
+                    yield ("sleep", poll)
+            elif "set" in step:
+                self._write(step["set"], step["value"])
+            elif "add" in step:
+                self._write(step["add"], self._read(step["add"]) + step["value"])
+            elif "freeze" in step:
+                self._freeze(name, step["freeze"], step.get("value"))
+            elif "unfreeze" in step:
+                self._unfreeze((name, step["unfreeze"]))
+            elif "repeat" in step:
+                count = step["repeat"]
+                every = float(step.get("every", 0))
+                i = 0
+                while count is None or i < count:
+                    yield from self._interpret(name, step["steps"])
+                    i += 1
+                    if every:
+                        yield ("sleep", every)
+                    elif count is None:
+                        yield ("sleep", self.wheel.tick)   # never spin the loop
+            elif "log" in step:
+                self.log(name, str(step["log"]))
+
+    def _field(self, field):
+        if field not in self.fields:
+            raise ValueError(f"Unknown field '{field}'")
+        resolve, code = self.fields[field]
+        return resolve(), struct.Struct('<' + code)
+
+    def _read(self, field):
+        addr, st = self._field(field)
+        return st.unpack(self.mem.read_bytes(addr, st.size))[0]
+
+    def _write(self, field, value):
+        addr, st = self._field(field)
+        if st.format[-1] in "fd":
+            value = float(value)
+        else:
+            value = int(value)
+            if st.format[-1] == "I":
+                value = max(0, min(value, 0xFFFFFFFF))
+        self.mem.write_bytes(addr, st.pack(value))
+
+    def _freeze(self, name, field, value):
+        addr, st = self._field(field)
+        if value is None:
+            value = st.unpack(self.mem.read_bytes(addr, st.size))[0]
+        packed = st.pack(value)
+        mem, resolve = self.mem, self.fields[field][0]
+        def hold(ev):
+            if ev.new == packed:
+                return
+            # pointer fields (fuel) move or vanish between races: only write while the
+            # field still resolves here; _retarget_freezes moves the watch on the next event
+            try:
+                if resolve() != ev.addr:
+                    return
+            except Exception:
+                return
+            mem.write_bytes(ev.addr, packed)
+        key = (name, field)
+        self._unfreeze(key)
+        self._freezes[key] = [addr, self.watcher.watch(addr, st.size, hold), hold]
+        self.watcher.start()
+
+    def _unfreeze(self, key):
+        entry = self._freezes.pop(key, None)
+        if entry and entry[1]:
+            self.watcher.unwatch(entry[1])
+
+    def _retarget_freezes(self):
+        """Re-resolve every frozen field; follow moved objects, pause while a field doesn't resolve."""
+        for (_, field), entry in self._freezes.items():
+            resolve, code = self.fields[field]
+            try:
+                addr = resolve()
+            except Exception:
+                addr = None
+            if addr == entry[0]:
+                continue
+            if entry[1]:
+                self.watcher.unwatch(entry[1])
+            entry[0] = addr
+            entry[1] = self.watcher.watch(addr, struct.calcsize('<' + code), entry[2]) if addr else None
+
+def load_scripts(path=SCRIPTS_DIR):
+    """Return {name: steps} for every scripts/<name>.json that validates."""
+    scripts = {}
+    try:
+        entries = sorted(e.name for e in os.scandir(path) if e.name.endswith(".json"))
+    except OSError:
+        return scripts
+    for fname in entries:
+        try:
+            with open(os.path.join(path, fname), "r") as fh:
+                scripts[fname[:-5]] = validate_script(json.load(fh))
+        except Exception as e:
+            print(f"Skipping script {fname}: {e}", file=sys.stderr)
+    return scripts
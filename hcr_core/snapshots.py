@@ -0,0 +1,128 @@
+"""
+Snapshots of trainer-managed values, with one-shot restore.
+- take() reads every target (single fields or whole objects) with batched span reads.
+- A snapshot keeps its bytes as regions of byte-adjacent targets, so restore() costs one
+  write per contiguous region instead of one per field.
+- History is bounded by count and by bytes; the oldest snapshots are evicted first.
+
+    snaps = SnapshotStore(session.mem)
+    snap = snaps.take({"coins": (coins_addr, "I"), "fuel_object": (ptr, FUEL_OBJECT)}, "before +100M")
+    ...
+    snaps.restore(snap)
+"""
+
+import time
+import struct
+import threading
+from collections import deque
+
+from .memory import plan_reads
+from .layouts import Layout
+
+def _size(kind):
+    return kind.size if isinstance(kind, Layout) else struct.calcsize('<' + kind)
+
+class Snapshot:
+    """Saved bytes of named targets; `targets` maps name -> (addr, struct code or Layout)."""
+    def __init__(self, label, targets, regions):
+        self.label = label
+        self.t = time.time()
+        self.targets = targets
+        self.regions = regions          # [(addr, bytes)] sorted, one per contiguous run of targets
+        self.nbytes = sum(len(data) for _, data in regions)
+
+    def raw(self, name):
+        addr, kind = self.targets[name]
+        return self._bytes(addr, _size(kind))
+
+    def _bytes(self, addr, size):
+        for start, data in self.regions:
+            if start <= addr and addr + size <= start + len(data):
+                return data[addr - start:addr - start + size]
+        raise KeyError(hex(addr))
+
+    def values(self):
+        """{name: value} (a dict of fields for object targets)."""
+        out = {}
+        for name, (_, kind) in self.targets.items():
+            raw = self.raw(name)
+            out[name] = kind.decode(raw) if isinstance(kind, Layout) else struct.unpack('<' + kind, raw)[0]
+        return out
+
+    def regions_for(self, names):
+        """Restore regions covering only `names` (still merged where they touch)."""
+        names = [n for n in names if n in self.targets]
+        addrs = [self.targets[n][0] for n in names]
+        plan = plan_reads(addrs, [_size(self.targets[n][1]) for n in names], max_gap=0)
+        return [(start, self._bytes(start, length)) for start, length, _ in plan]
+
+    def __repr__(self):
+        return f"<Snapshot {self.label!r} {len(self.targets)} targets, {len(self.regions)} regions>"
+
+class SnapshotStore:
+    """Bounded history of snapshots of one MemHelper's target."""
+    def __init__(self, mem, limit=32, max_bytes=1 << 20):
+        self.mem = mem
+        self.limit = limit
+        self.max_bytes = max_bytes
+        self.evicted = 0
+        self._history = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def take(self, targets, label=""):
+        """Snapshot `targets` (name -> (addr, code or Layout)); unreadable targets are left out."""
+        names = [n for n, (addr, _) in targets.items() if addr]
+        addrs = [targets[n][0] for n in names]
+        sizes = [_size(targets[n][1]) for n in names]
+        # read with the usual gap so nearby targets share a read ...
+        spans = plan_reads(addrs, sizes)
+        bufs = self.mem.read_spans(spans)
+        # ... but keep only the targets' own bytes, merged where they touch
+        regions, kept = [], {}
+        i = 0
+        for start, length, members in plan_reads(addrs, sizes, max_gap=0):
+            while spans[i][0] + spans[i][1] < start + length:
+                i += 1
+            buf = bufs[i]
+            if buf is None:
+                continue
+            off = start - spans[i][0]
+            regions.append((start, bytes(buf[off:off + length])))
+            for idx, _ in members:
+                kept[names[idx]] = targets[names[idx]]
+        snap = Snapshot(label, kept, regions)
+        with self._lock:
+            self._history.append(snap)
+            self._bytes += snap.nbytes
+            while len(self._history) > 1 and (len(self._history) > self.limit or self._bytes > self.max_bytes):
+                self._bytes -= self._history.popleft().nbytes
+                self.evicted += 1
+        return snap
+
+    def history(self):
+        """Snapshots, newest first."""
+        with self._lock:
+            return list(reversed(self._history))
+
+    def latest(self):
+        with self._lock:
+            return self._history[-1] if self._history else None
+
+    def drop(self, snap):
+        with self._lock:
+            try:
+                self._history.remove(snap)
+                self._bytes -= snap.nbytes
+            except ValueError:
+                pass
+
+    def restore(self, snap=None, names=None):
+        """Write a snapshot back (default: the latest), optionally just `names`; returns the number of writes."""
+        snap = snap or self.latest()
+        if snap is None:
+            raise RuntimeError("No snapshot to restore")
+        regions = snap.regions if names is None else snap.regions_for(names)
+        for addr, data in regions:
+            self.mem.write_bytes(addr, data)
+        return len(regions)
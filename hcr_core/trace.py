@@ -0,0 +1,394 @@
+"""
+MemHelper I/O traces: record every operation a session makes, replay it offline.
+- TraceRecorder hooks into MemHelper (mem.tracer) and logs op, thread, start time, duration,
+  address, size, arguments and result. Nested calls (read_many -> read_spans -> readinto ...)
+  are logged too, flagged as nested, so the trace also holds every value read.
+- The hot path only appends a tuple to a deque; a background thread encodes and writes.
+- replay() drives the top-level ops against a SparseSimBackend seeded from the trace,
+  one thread per recorded thread, at recorded pace or flat out.
+
+File: b"HCRTRC1\\n", uint32 header length, JSON header, then one record per op:
+    op B, flags B, thread H, t_ns q, dur_ns I, addr Q, size I, payload length I, payload
+"""
+
+import os
+import json
+import time
+import atexit
+import struct
+import threading
+from array import array
+from collections import deque, namedtuple
+
+from .memory import MemHelper, SparseSimBackend
+
+_now = time.perf_counter_ns
+_ident = threading.get_ident
+
+TRACE_MAGIC = b"HCRTRC1\n"
+TRACE_PATH = os.environ.get("HCR_TRACE")        # set: GameSession traces everything it does to this file
+OPS = ("module_base", "read_int", "read_uint", "read_longlong", "read_float", "read_bytes", "readinto",
+       "read_spans", "read_many", "write_bytes", "write_int", "write_uint", "write_float_bytes_as_int",
+       "resolve_pointer")
+FLAG_ERROR, FLAG_NESTED, FLAG_INPLACE = 1, 2, 4
+
+# positional parameters of each traced MemHelper method (kwargs are folded in before encoding)
+_PARAMS = {
+    "module_base": ("name",),
+    "read_int": ("addr",), "read_uint": ("addr",), "read_longlong": ("addr",), "read_float": ("addr",),
+    "read_bytes": ("addr", "size"), "readinto": ("addr", "buf"),
+    "read_spans": ("plan", "bufs"), "read_many": ("addrs", "size"),
+    "write_bytes": ("addr", "b"), "write_int": ("addr", "value"), "write_uint": ("addr", "value"),
+    "write_float_bytes_as_int": ("addr", "float_value"),
+    "resolve_pointer": ("base_addr", "offsets", "pointer_size"),
+}
+_VALUE = {
+    "read_int": struct.Struct('<i'), "read_uint": struct.Struct('<I'), "read_longlong": struct.Struct('<q'),
+    "read_float": struct.Struct('<f'), "write_int": struct.Struct('<i'), "write_uint": struct.Struct('<I'),
+    "write_float_bytes_as_int": struct.Struct('<f'),
+}
+_REC = struct.Struct('<BBHqIQII')
+_SPAN = struct.Struct('<QI')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_I64 = struct.Struct('<q')
+_NONE_ADDR = 0xFFFFFFFFFFFFFFFF     # read_many address slot that was None
+
+TraceOp = namedtuple("TraceOp", "op nested error thread t dur addr size args result")
+
+# ---------------------------
+# Recording
+# ---------------------------
+class TraceRecorder:
+    """Records a MemHelper's operations to `path` until stop(); data=False skips the bytes read."""
+    def __init__(self, path, data=True, flush_every=0.05):
+        self.path = path
+        self.data = data
+        self.flush_every = flush_every
+        self.records = 0
+        self.dropped = 0            # records that could not be encoded (skipped, the trace goes on)
+        self._q = deque()
+        self._threads = {}
+        self._stop = threading.Event()
+        self._writer = None
+        self._mem = None
+        self._t0 = 0
+
+    def start(self, mem):
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._t0 = time.perf_counter_ns()
+        header = json.dumps({"start": time.time(), "backend": mem.backend, "pid": mem.pid,
+                             "ops": OPS, "data": self.data}).encode()
+        with open(self.path, "wb") as fh:
+            fh.write(TRACE_MAGIC + _U32.pack(len(header)) + header)
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._writer_worker, daemon=True)
+        self._writer.start()
+        self._mem = mem
+        mem.tracer = self
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        if self._mem is not None and self._mem.tracer is self:
+            self._mem.tracer = None
+        self._stop.set()
+        if self._writer:
+            self._writer.join()
+            self._writer = None
+
+    def call(self, fn, mem, args, kwargs, nested):
+        """Run one MemHelper op (called from _in_flight) and queue its record."""
+        name = fn.__name__
+        t0 = _now()
+        try:
+            ret = fn(mem, *args, **kwargs)
+        except Exception:
+            self._q.append((name, nested, _ident(), t0, _now() - t0, args, kwargs, None, True))
+            raise
+        dur = _now() - t0
+        result = ret
+        # buffers the caller will reuse are copied now; everything else is encoded later
+        if name == "readinto":
+            result = bytes(args[1]) if len(args) > 1 else bytes(kwargs["buf"])
+        elif name == "read_spans" and ret:
+            result = [None if b is None else bytes(b) for b in ret]
+        elif name == "write_bytes" and len(args) > 1 and not isinstance(args[1], bytes):
+            args = (args[0], bytes(args[1]))
+        self._q.append((name, nested, _ident(), t0, dur, args, kwargs, result, False))
+        return ret
+
+    def _writer_worker(self):
+        with open(self.path, "ab") as fh:
+            while True:
+                stopping = self._stop.wait(self.flush_every)
+                out = []
+                q = self._q
+                while q:
+                    try:
+                        out.append(self._encode(q.popleft()))
+                    except Exception:
+                        self.dropped += 1
+                if out:
+                    fh.write(b"".join(out))
+                    fh.flush()
+                    self.records += len(out)
+                if stopping:
+                    break
+
+    def _encode(self, rec):
+        name, nested, ident, t0, dur, args, kwargs, result, error = rec
+        a = dict(zip(_PARAMS[name], args))
+        a.update(kwargs)
+        flags = (FLAG_ERROR if error else 0) | (FLAG_NESTED if nested else 0)
+        ok_data = self.data and not error
+        addr = size = 0
+        payload = b""
+        if name == "module_base":
+            payload = (b"" if error else _U64.pack(result or 0)) + str(a["name"]).encode()
+        elif name in ("read_int", "read_uint", "read_longlong", "read_float"):
+            st = _VALUE[name]
+            addr, size = a["addr"], st.size
+            if ok_data:
+                payload = st.pack(result)
+        elif name == "read_bytes":
+            addr, size = a["addr"], a["size"]
+            if ok_data:
+                payload = bytes(result)
+        elif name == "readinto":
+            addr, size = a["addr"], len(a["buf"])
+            if ok_data:
+                payload = result
+        elif name == "read_spans":
+            plan = a["plan"]
+            size = len(plan)
+            if a.get("bufs") is not None:
+                flags |= FLAG_INPLACE
+            payload = b"".join(_SPAN.pack(start, length) for start, length, _ in plan)
+            if ok_data:
+                payload += bytes(b is not None for b in result) + b"".join(b for b in result if b is not None)
+        elif name == "read_many":
+            addrs = a["addrs"]
+            size = a.get("size", 4)
+            payload = _U32.pack(len(addrs)) + array('Q', [_NONE_ADDR if x is None else int(x) for x in addrs]).tobytes()
+            if ok_data:
+                payload += bytes(b is not None for b in result) + b"".join(b for b in result if b is not None)
+        elif name == "write_bytes":
+            addr, data = a["addr"], bytes(a["b"])
+            size, payload = len(data), data
+        elif name in ("write_int", "write_uint", "write_float_bytes_as_int"):
+            st = _VALUE[name]
+            addr, size = a["addr"], st.size
+            try:
+                value = a["float_value"] if "float_value" in a else a["value"]
+                payload = st.pack(float(value) if st.format[-1] == "f" else int(value))
+            except (struct.error, TypeError, ValueError):
+                payload = b""
+        elif name == "resolve_pointer":
+            offsets = list(a["offsets"] or ())
+            addr, size = a["base_addr"], a.get("pointer_size", 4)
+            payload = _U32.pack(len(offsets)) + array('q', offsets).tobytes()
+            if not error:
+                # read_int is signed, so a pointer >= 0x80000000 comes back negative; stored
+                # as 64-bit two's complement and decoded signed
+                payload += _U64.pack(int(result) & _NONE_ADDR)
+        tid = self._threads.setdefault(ident, len(self._threads))
+        return _REC.pack(OPS.index(name), flags, tid & 0xFFFF, t0 - self._t0, min(dur, 0xFFFFFFFF),
+                         int(addr) & _NONE_ADDR, size, len(payload)) + payload
+
+# ---------------------------
+# Loading
+# ---------------------------
+def load_trace(path):
+    """Load a trace file; returns (meta, [TraceOp, ...]) in recorded order."""
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    if not raw.startswith(TRACE_MAGIC):
+        raise ValueError(f"{path} is not a trainer trace")
+    pos = len(TRACE_MAGIC)
+    (hlen,) = _U32.unpack_from(raw, pos)
+    pos += 4
+    meta = json.loads(raw[pos:pos + hlen])
+    pos += hlen
+    names = meta["ops"]
+    ops = []
+    while pos + _REC.size <= len(raw):
+        op_id, flags, tid, t, dur, addr, size, plen = _REC.unpack_from(raw, pos)
+        pos += _REC.size
+        payload = raw[pos:pos + plen]
+        pos += plen
+        if len(payload) < plen:
+            break                               # torn tail from a killed process
+        name = names[op_id]
+        error = bool(flags & FLAG_ERROR)
+        args, result = _decode(name, flags, addr, size, payload, error)
+        ops.append(TraceOp(name, bool(flags & FLAG_NESTED), error, tid, t, dur, addr, size, args, result))
+    return meta, ops
+
+def _decode(name, flags, addr, size, payload, error):
+    """Call arguments (buffers as sizes) and recorded result (None when not recorded)."""
+    if name == "module_base":
+        if error:
+            return (payload.decode(),), None
+        return (payload[8:].decode(),), _U64.unpack_from(payload)[0]
+    if name in ("read_int", "read_uint", "read_longlong", "read_float"):
+        return (addr,), _VALUE[name].unpack(payload)[0] if payload else None
+    if name in ("read_bytes", "readinto"):
+        return (addr, size), payload or None
+    if name in ("read_spans", "read_many"):
+        if name == "read_spans":
+            count = size
+            spans = [_SPAN.unpack_from(payload, i * _SPAN.size) for i in range(count)]
+            pos = count * _SPAN.size
+            lengths = [length for _, length in spans]
+            args = ([(start, length, []) for start, length in spans], bool(flags & FLAG_INPLACE))
+        else:
+            (count,) = _U32.unpack_from(payload)
+            addrs = array('Q')
+            addrs.frombytes(payload[4:4 + 8 * count])
+            pos = 4 + 8 * count
+            lengths = [size] * count
+            args = ([None if x == _NONE_ADDR else x for x in addrs], size)
+        if len(payload) <= pos:
+            return args, None
+        valid, pos = payload[pos:pos + count], pos + count
+        result = []
+        for ok, length in zip(valid, lengths):
+            if ok:
+                result.append(payload[pos:pos + length])
+                pos += length
+            else:
+                result.append(None)
+        return args, result
+    if name == "write_bytes":
+        return (addr, payload), None
+    if name in ("write_int", "write_uint", "write_float_bytes_as_int"):
+        return (addr, _VALUE[name].unpack(payload)[0] if payload else 0), None
+    # resolve_pointer
+    (count,) = _U32.unpack_from(payload)
+    offsets = array('q')
+    offsets.frombytes(payload[4:4 + 8 * count])
+    result = None if error else _I64.unpack_from(payload, 4 + 8 * count)[0]
+    return (addr, list(offsets), size), result
+
+# ---------------------------
+# Replay
+# ---------------------------
+def _observed(op):
+    """(addr, bytes) the op saw in the target's memory, and (addr, size) ranges it touched successfully."""
+    seen, touched = [], []
+    name = op.op
+    if name in ("read_int", "read_uint", "read_longlong", "read_float") and op.result is not None:
+        seen.append((op.addr, _VALUE[name].pack(op.result)))
+    elif name in ("read_bytes", "readinto") and op.result is not None:
+        seen.append((op.addr, op.result))
+    elif name in ("read_spans", "read_many") and op.result is not None:
+        if name == "read_spans":
+            starts = [start for start, _, _ in op.args[0]]
+        else:
+            starts = op.args[0]
+        for start, data in zip(starts, op.result):
+            if start is not None and data is not None:
+                seen.append((start, data))
+    elif name.startswith("write") and not op.error:
+        touched.append((op.addr, op.size))
+    elif name in ("read_int", "read_uint", "read_longlong", "read_float", "read_bytes", "readinto") and not op.error:
+        touched.append((op.addr, op.size))
+    return seen, touched
+
+def build_sim(ops):
+    """SparseSimBackend holding what the trace saw: the earliest value read at every address,
+    every page a successful op touched, and the recorded module bases."""
+    sim = SparseSimBackend()
+    seen = []
+    for op in ops:
+        if op.op == "module_base" and op.result is not None:
+            sim.modules[op.args[0]] = op.result
+        s, touched = _observed(op)
+        seen.extend(s)
+        for addr, size in touched:
+            sim.map(addr, size)
+    for addr, data in reversed(seen):          # earliest observation is written last, so it wins
+        sim.map(addr, len(data))
+        sim.write(addr, data)
+    return sim
+
+def _call_args(op):
+    """Fresh call arguments for one op (new buffers where the original call passed its own)."""
+    if op.op == "readinto":
+        return (op.args[0], bytearray(op.args[1]))
+    if op.op == "read_spans":
+        plan, inplace = op.args
+        return (plan, [bytearray(length) for _, length, _ in plan] if inplace else None)
+    return op.args
+
+def replay(ops, speed=None, threaded=True, mem=None):
+    """Run the top-level ops against `mem` (default: a MemHelper on build_sim(ops)).
+
+    speed=None runs flat out, 1.0 at the recorded pace (2.0 twice as fast...). With `threaded`
+    every recorded thread gets its own replay thread, so contention is reproduced too.
+    Returns (wall seconds, {op: [count, recorded_ns, replay_ns, errors, recorded_errors]}).
+    """
+    if mem is None:
+        mem = MemHelper()
+        mem.attach_backend(build_sim(ops))
+    top = [op for op in ops if not op.nested]
+    if not top:
+        return 0.0, {}
+    streams = {}
+    for op in top:
+        streams.setdefault(op.thread if threaded else 0, []).append(op)
+    base_t = top[0].t
+    results = []
+    start = [0.0]
+    ready = threading.Barrier(len(streams) + 1)
+
+    def run(stream, stats):
+        perf, sleep = time.perf_counter_ns, time.sleep
+        calls = [(getattr(mem, op.op), op) for op in stream]
+        ready.wait()
+        t_start = start[0]
+        for fn, op in calls:
+            if speed:
+                delay = t_start + (op.t - base_t) / speed - perf()
+                if delay > 0:
+                    sleep(delay / 1e9)
+            args = _call_args(op)
+            t0 = perf()
+            try:
+                fn(*args)
+                failed = 0
+            except Exception:
+                failed = 1
+            dt = perf() - t0
+            st = stats.get(op.op)
+            if st is None:
+                st = stats[op.op] = [0, 0, 0, 0, 0]
+            st[0] += 1
+            st[1] += op.dur
+            st[2] += dt
+            st[3] += failed
+            st[4] += op.error
+
+    threads = []
+    for stream in streams.values():
+        stats = {}
+        results.append(stats)
+        threads.append(threading.Thread(target=run, args=(stream, stats), daemon=True))
+    for t in threads:
+        t.start()
+    start[0] = time.perf_counter_ns()
+    ready.wait()
+    wall0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall0
+    merged = {}
+    for stats in results:
+        for name, st in stats.items():
+            m = merged.setdefault(name, [0, 0, 0, 0, 0])
+            for i, v in enumerate(st):
+                m[i] += v
+    return wall, merged
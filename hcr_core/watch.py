@@ -0,0 +1,134 @@
+"""
+Change watcher: one polling thread shared by every consumer of a game value.
+"""
+
+import sys
+import time
+import threading
+from collections import namedtuple
+
+from .memory import plan_reads, span_buffers
+
+# ---------------------------
+# Change watcher (one shared polling stream, callbacks only on change)
+# ---------------------------
+WatchEvent = namedtuple("WatchEvent", "addr size old new t")
+
+class ChangeWatcher:
+    """Polls every watched address in batched span reads and reports changes.
+
+    Subscribers to the same (addr, size) share one watch: the bytes are read
+    once per tick, compared raw (span-level bytearray compare first, then
+    per-watch memoryview slices), and each change produces a single
+    WatchEvent(addr, size, old, new, t) delivered to every subscriber. The
+    first observation, and the first one after reads there failed, is
+    reported with old=None. Callbacks run on the watcher thread and should
+    hand UI work to Tk via `after`.
+    """
+    def __init__(self, mem, rate=60):
+        self.mem = mem
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._watches = {}          # (addr, size) -> tuple of callbacks
+        self._last = {}             # (addr, size) -> last seen bytes
+        self._version = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, addr, size, callback):
+        key = (int(addr), size)
+        with self._lock:
+            self._watches[key] = self._watches.get(key, ()) + (callback,)
+            self._version += 1
+        if key in self._last:
+            # late subscriber: give it the current value straight away
+            callback(WatchEvent(key[0], size, None, self._last[key], time.time()))
+        self._wake.set()
+        return (key, callback)
+
+    def unwatch(self, handle):
+        key, callback = handle
+        with self._lock:
+            subs = tuple(cb for cb in self._watches.get(key, ()) if cb is not callback)
+            if subs:
+                self._watches[key] = subs
+            else:
+                self._watches.pop(key, None)
+                self._last.pop(key, None)
+            self._version += 1
+
+    def latest(self, addr, size):
+        """Last bytes seen at (addr, size); None before the first read or while reads there fail."""
+        return self._last.get((int(addr), size))
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll_worker, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop polling; with `timeout`, give up waiting for a callback that is still running."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def _compile(self):
+        with self._lock:
+            keys = list(self._watches)
+            version = self._version
+        plan = plan_reads([a for a, _ in keys], [n for _, n in keys])
+        spans = []                  # per span: [(key, offset, size), ...]
+        for _, _, members in plan:
+            spans.append([(keys[idx], off, keys[idx][1]) for idx, off in members])
+        return version, plan, spans, span_buffers(plan), span_buffers(plan)
+
+    def _poll_worker(self):
+        period = 1.0 / self.rate
+        version = -1
+        deadline = time.perf_counter()
+        while not self._stop.is_set():
+            if version != self._version:
+                version, plan, spans, cur, prev = self._compile()
+                fresh = [True] * len(plan)
+            if not plan:
+                self._wake.wait()
+                self._wake.clear()
+                deadline = time.perf_counter()
+                continue
+            bufs = self.mem.read_spans(plan, cur)
+            now = time.time()
+            for i, buf in enumerate(bufs):
+                if buf is None:
+                    fresh[i] = True     # buffer holds junk now; don't trust it as "prev"
+                    for key, _, _ in spans[i]:
+                        self._last.pop(key, None)   # value unknown until a read succeeds again
+                    continue
+                if not fresh[i] and buf == prev[i]:
+                    continue
+                fresh[i] = False
+                view = memoryview(buf)
+                for key, off, size in spans[i]:
+                    new = view[off:off + size]
+                    old = self._last.get(key)
+                    if old is not None and new == old:
+                        continue
+                    new = bytes(new)
+                    self._last[key] = new
+                    ev = WatchEvent(key[0], size, old, new, now)
+                    for cb in self._watches.get(key, ()):
+                        try:
+                            cb(ev)
+                        except Exception as e:
+                            print(f"Watch callback failed for {hex(key[0])}: {e}", file=sys.stderr)
+            cur, prev = prev, cur
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                deadline = time.perf_counter()
@@ -1,8 +1,10 @@
+import time
+started=time.perf_counter()
+import os
 from tkinter import *
 import tkinter.messagebox as tmsg
-from ReadWriteMemory import ReadWriteMemory
-import pymem
-from pymem.process import *
+from hcr_core.attach import get_session
+from hcr_core.fields import GAME_PROCESS, COINS_OFFSET, DIAMONDS_OFFSET
 
 root = Tk()
 #root.iconbitmap('Icon/icon.ico')
@@ -19,8 +21,9 @@ font="comicsansms 11 bold"
 # Special Variables Part 1
 coin_var = IntVar()
 diamond_var = IntVar()
-game=None
-rm = ReadWriteMemory()
+session = get_session() # Nothing is attached until find_process() runs
+coins=0
+diamonds=0
 idiot="That's too big!! YOU IDIOT!!"
 maximum=999999999
 
@@ -31,29 +34,16 @@ root.title(f"{name} Trainer +2")
 
 # Functions
 def find_process():
-	global game
+	global coins, diamonds
 	try:
-		game = rm.get_process_by_name('HillClimbRacing.exe')
-		game.open()
+		session.attach(GAME_PROCESS, module=None) # One handle, opened once
+		coins=session.base_address+COINS_OFFSET
+		diamonds=session.base_address+DIAMONDS_OFFSET
 		return True
 	except:
 		tmsg.showwarning('Warning',not_found)
 		return False
 
-def get_base_address(process_name):
-	try:
-		pm = pymem.Pymem(f"{process_name}")
-		return module_from_name(pm.process_handle, f"{process_name}").lpBaseOfDll
-	except:
-		return 0x0
-
-# Special Variables Part 2
-base_address=get_base_address("HillClimbRacing.exe")
-coins=base_address+0x28CAD4
-diamonds=base_address+0x28CAEC
-
-
-# Continue Writing Functions
 def check_if_numeric():
 	try:
 		add=coin_var.get()+diamond_var.get()
@@ -62,11 +52,11 @@ def check_if_numeric():
 		return False
 
 def find_coins():
-	coin_value = game.read(coins)
+	coin_value = session.mem.read_uint(coins)
 	coin_var.set(coin_value)
 
 def find_diamonds():
-	diamond_value=game.read(diamonds)
+	diamond_value=session.mem.read_uint(diamonds)
 	diamond_var.set(diamond_value)
 
 def modify_coins():
@@ -76,7 +66,7 @@ def modify_coins():
 		if coin_var.get() > maximum:
 			tmsg.showwarning('Warning',idiot)
 		else:
-			game.write(coins, coin_var.get())
+			session.mem.write_uint(coins, coin_var.get())
 			tmsg.showinfo('Success','Check Your Coins!!!')
 
 def modify_diamonds():
@@ -86,7 +76,7 @@ def modify_diamonds():
 		if diamond_var.get() > maximum:
 			tmsg.showwarning('Warning',idiot)
 		else:
-			game.write(diamonds, diamond_var.get())
+			session.mem.write_uint(diamonds, diamond_var.get())
 			tmsg.showinfo('Success','Check Your Diamond!!!')
 
 
@@ -128,5 +118,8 @@ if find_process() == False: # Needed for detecting if the process is running or
 else:
 	find_coins()
 	find_diamonds()
+	if os.environ.get("HCR_STARTUP_TIMING"): # Used by benchmarks/bench_cold_start.py
+		print(f"startup_ms={(time.perf_counter()-started)*1000:.1f} attach_ms={session.timings.get('attach',0)*1000:.1f} module_base_ms={session.timings.get('module_base',0)*1000:.1f}",flush=True)
+		root.after(0,root.destroy)
 
 root.mainloop()
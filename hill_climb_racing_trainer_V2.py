@@ -2,21 +2,26 @@
 Cute Portrait Trainer - Tkinter (simplified)
 - Leave `game` and `module` as None (you will set them).
 - Auto-checks process on startup and quits if not found.
-- Uses ReadWriteMemory for writes, pymem for pointer reads.
+- Uses a native ctypes backend (ReadProcessMemory/WriteProcessMemory) when it can,
+  else ReadWriteMemory for writes, pymem for pointer reads (HCR_MEM_BACKEND=auto|native|legacy).
 - Portrait layout, simple look.
-- Infinite fuel writes the float(100.00) bytes repeatedly to freeze.
+- Infinite fuel rewrites the float(100.00) bytes whenever the game changes them;
+  "Auto" arms/disarms it on race start/end (RaceDetector).
 - Boost recalibration supported.
 - Save button lives in the Hotkeys window only.
+- Recorder samples coins/diamonds/fuel/boosts at 60 Hz into recordings/*.hcrrec.
+- Scripts (scripts/*.json step lists) run on one shared event-loop thread.
+- Every coin/diamond/boost write is preceded by a snapshot; "Restore" rolls one back in one batched write.
+- Hotkeys share a single keyboard hook (hcr_core.hotkeys.HotkeyHub); add/remove never rebuilds it.
+- Memory, attach and game services live in the shared hcr_core package (this file is the UI).
 """
 
 import os
-import sys
-import json
-import time
+import queue
 import struct
+import functools
 import threading
-import ctypes
-from ctypes import wintypes
+import time
 import tkinter as tk
 from tkinter import messagebox, ttk
 
@@ -27,28 +32,15 @@ try:
 except Exception:
     PIL_AVAILABLE = False
 
-# memory libs
-try:
-    from ReadWriteMemory import ReadWriteMemory
-    RWM_AVAILABLE = True
-except Exception:
-    RWM_AVAILABLE = False
-
-try:
-    import pymem
-    import pymem.process
-    PYMEM_AVAILABLE = True
-except Exception:
-    PYMEM_AVAILABLE = False
-
-import psutil
-
-# hotkey lib
-try:
-    import keyboard
-    KEYBOARD_AVAILABLE = True
-except Exception:
-    KEYBOARD_AVAILABLE = False
+from hcr_core.attach import get_session
+from hcr_core.fields import FIELDS, GAME_PROCESS, GAME_MODULE, BOOST_SECONDARY_OFFSETS, BOOST_THIRD_OFFSETS
+from hcr_core.watch import ChangeWatcher
+from hcr_core.race import RaceDetector
+from hcr_core.recorder import ValueRecorder, RECORDINGS_DIR
+from hcr_core.scripts import ScriptEngine, SCRIPTS_DIR, load_scripts
+from hcr_core.profiles import ProfileStore
+from hcr_core.snapshots import SnapshotStore
+from hcr_core.hotkeys import HotkeyHub
 
 # ---------------------------
 # ToolTip class
@@ -75,190 +67,20 @@ class ToolTip(object):
         if self.tw:
             self.tw.destroy()
 
-# ---------------------------
-# EXACT functions you asked to keep (unchanged)
-# ---------------------------
-def get_module_base_address(process_name, module_name):
-    try:
-        pm = pymem.Pymem(process_name)
-        module = pymem.process.module_from_name(pm.process_handle, module_name)
-        if module:
-            return module.lpBaseOfDll
-        else:
-            return 0x0
-    except:
-        return 0x0
-
-def get_base_address(process_name):
-    try:
-        pm = pymem.Pymem(f"{process_name}")
-        return pymem.process.module_from_name(pm.process_handle, f"{process_name}").lpBaseOfDll
-    except:
-        return 0x0
-
 # ---------------------------
 # Set these before running (left as None for you to edit)
 # ---------------------------
-game = "HillClimbRacing.exe"         # e.g. "Hill Climb Racing.exe"  <-- set this in the file before running
-module = "cocos2d-win10.dll"       # e.g. "game.dll"    <-- set if needed
+game = GAME_PROCESS         # e.g. "Hill Climb Racing.exe"  <-- set this in the file before running
+module = GAME_MODULE       # e.g. "game.dll"    <-- set if needed
 
-# ---------------------------
-# Offsets/constants from your original spec
-# ---------------------------
-COINS_OFFSET = 0x28CAD4
-DIAMONDS_OFFSET = 0x28CAEC
-FUEL_BASE_OFFSET = 0x0028CA2C
-FUEL_OFFSETS = [0x2A8]
-BOOST_BASE_OFFSET = 0x00396244
-BOOST_OFFSETS = [0x4,0x14,0x14,0x8,0x30,0xF8,0xE4]
-BOOST_SECONDARY_OFFSETS = [0x4,0x14,0x14,0x8,0x7C,0xF8,0xE4]
-BOOST_THIRD_OFFSETS = [0x4,0x14,0x14,0x8,0x8C,0xF8,0xE4]
-
-CONFIG_PATH = "config.json"
-
-# ---------------------------
-# Memory helper (compact)
-# ---------------------------
-class MemHelper:
-    def __init__(self):
-        self.rwm_proc = None
-        self.pm = None
-        self.pid = None
-        self.backend = None
-
-    def attach_by_name(self, proc_name):
-        """Attach using process name; raises on failure."""
-        pid = None
-        for p in psutil.process_iter(['pid','name']):
-            if p.info['name'] and p.info['name'].lower() == proc_name.lower():
-                pid = p.info['pid']; break
-        if not pid:
-            raise ProcessLookupError(f"Process '{proc_name}' not found.")
-        return self.attach_by_pid(pid)
-
-    def attach_by_pid(self, pid):
-        self.detach()
-        self.pid = pid
-        # try ReadWriteMemory for writes
-        if RWM_AVAILABLE:
-            try:
-                rwm = ReadWriteMemory()
-                proc = rwm.get_process_by_id(pid)
-                proc.open()
-                self.rwm_proc = proc
-                self.backend = 'rwm'
-            except Exception:
-                self.rwm_proc = None
-        # pymem for reads/pointer traversal
-        if PYMEM_AVAILABLE:
-            try:
-                pm = pymem.Pymem()
-                pm.open_process_from_id(pid)
-                self.pm = pm
-            except Exception:
-                self.pm = None
-        if not (self.rwm_proc or self.pm):
-            raise RuntimeError("Could not attach to process (need ReadWriteMemory or pymem). Try running as Admin.")
-
-    def detach(self):
-        try:
-            if self.rwm_proc:
-                try: self.rwm_proc.close()
-                except: pass
-            if self.pm:
-                try: self.pm.close_process()
-                except: pass
-        finally:
-            self.rwm_proc = None
-            self.pm = None
-            self.pid = None
-            self.backend = None
-
-    # read helpers (pymem required)
-    def read_int(self, addr):
-        if not self.pm:
-            raise RuntimeError("pymem not available")
-        return self.pm.read_int(addr)
-
-    def read_uint(self, addr):
-        if not self.pm:
-            raise RuntimeError("pymem not available")
-        return self.pm.read_uint(addr)
-
-    def read_float(self, addr):
-        if not self.pm:
-            raise RuntimeError("pymem not available")
-        return self.pm.read_float(addr)
-
-    # write helpers (prefer rwm, fallback to pymem)
-    def write_bytes(self, addr, b: bytes):
-        if self.rwm_proc:
-            try:
-                # many RWM bindings accept list of ints
-                if hasattr(self.rwm_proc, 'writeBytes'):
-                    self.rwm_proc.writeBytes(addr, list(b))
-                    return
-                if hasattr(self.rwm_proc, 'writeByte'):
-                    for i, bb in enumerate(b):
-                        self.rwm_proc.writeByte(addr + i, [bb])
-                    return
-            except Exception:
-                # fallback to pymem
-                pass
-        if self.pm:
-            self.pm.write_bytes(addr, b, len(b))
-            return
-        raise RuntimeError("No available write backend")
-
-    def write_int(self, addr, value):
-        b = int(value).to_bytes(4, byteorder='little', signed=True)
-        self.write_bytes(addr, b)
-
-    def write_uint(self, addr, value):
-        b = int(value).to_bytes(4, byteorder='little', signed=False)
-        self.write_bytes(addr, b)
-
-    def write_float_bytes_as_int(self, addr, float_value):
-        """Pack float into 4 bytes and write raw bytes (so float bits are placed; interpreted as float by game)."""
-        b = struct.pack('<f', float(float_value))
-        self.write_bytes(addr, b)
-
-    # pointer resolver
-    def resolve_pointer(self, base_addr, offsets, pointer_size=4):
-        if not self.pm:
-            raise RuntimeError("pymem required for pointer resolution")
-        cur = int(base_addr)
-        # If offsets empty, return base
-        if not offsets:
-            return cur
-        try:
-            for off in offsets:
-                # read pointer at cur
-                if pointer_size == 8:
-                    # 64-bit
-                    val = self.pm.read_longlong(cur)
-                else:
-                    val = self.pm.read_int(cur)
-                if val == 0:
-                    cur = cur + off
-                else:
-                    cur = val + off
-            return cur
-        except Exception:
-            # fallback simpler: read at (cur + off) each time
-            cur = int(base_addr)
-            try:
-                for off in offsets:
-                    cur = self.pm.read_int(cur + off)
-                return cur
-            except Exception as e:
-                raise
 
 # ---------------------------
 # UI / App
 # ---------------------------
 PORTRAIT_WIDTH = 480
 PORTRAIT_HEIGHT = 400
+UI_POLL_MS = 30             # how often the Tk thread runs work posted by background threads
+STOP_TIMEOUT = 1.0          # seconds to wait for each background thread on exit
 
 class TrainerApp:
     def __init__(self, root):
@@ -270,15 +92,40 @@ class TrainerApp:
         except Exception:
             pass
 
-        # memory
-        self.mem = MemHelper()
-        self.base_address = 0
-        self.module_base = 0
+        # background threads (watcher, race detector, scripts, hotkeys) never touch Tk themselves:
+        # they post callables here and the Tk thread runs them from _drain_ui
+        self.ui_queue = queue.Queue()
+
+        # memory (shared core session; attached once in startup_attach_and_read)
+        self.session = get_session()
+        self.mem = self.session.mem
+
+        # one shared polling stream for the dashboard, fuel freeze and recorder
+        self.watcher = ChangeWatcher(self.mem)
+        self.live = {}
+
+        # scripts share the watcher and MemHelper; addresses come from the session's field table
+        self.scripts = ScriptEngine(self.mem, {
+            name: (functools.partial(self.session.field_addr, name), field.code) for name, field in FIELDS.items()
+        }, self.watcher, log=self._script_log)
 
         # freeze control
-        self.fuel_freeze_event = threading.Event()
-        self.fuel_thread = None
+        self.fuel_watch = None
         self.fuel_freezing = False
+        self.fuel_lock = threading.Lock()
+        self.race = None
+
+        # value recorder (lock: the race detector retargets it while the UI starts / stops it)
+        self.recorder = None
+        self.recorder_lock = threading.Lock()
+
+        # snapshot history (taken before every mod)
+        self.snapshots = SnapshotStore(self.mem)
+
+        # every hotkey goes through one keyboard hook
+        # (actions run on the Tk thread via ui_queue; stats() latency includes that hop)
+        self.hotkeys = HotkeyHub(dispatch=self._post)
+        self.registered_hotkeys = []    # {'hotkey', 'cb', 'handle'} per active row
 
         # load images
         self.info_img = self._load_icon("Icon/info.ico", (28,28))
@@ -289,29 +136,57 @@ class TrainerApp:
         self.diamond_var = tk.StringVar(value="0")
         self.fuel_var = tk.StringVar(value="100.00")  # float-like string
         self.boost_var = tk.StringVar(value="0")
-
-        # Load config if exists
-        try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, "r") as fh:
-                    data = json.load(fh)
-                self.coin_var.set(data.get("coin", "0"))
-                self.diamond_var.set(data.get("diamond", "0"))
-                self.fuel_var.set(data.get("fuel", "100.00"))
-                self.boost_var.set(data.get("boost", "0"))
-                global game, module
-                if game is None:
-                    game = data.get("game")
-                if module is None:
-                    module = data.get("module")
-        except Exception:
-            pass
+        self.fuel_auto_var = tk.BooleanVar(value=False)
+        # plain copies for the detector / watcher threads (Tk vars are only read on the Tk thread)
+        self.fuel_value = 100.0
+        self.fuel_auto = False
+        self.fuel_var.trace_add("write", self._on_fuel_var)
+        self.fuel_auto_var.trace_add("write", lambda *_: setattr(self, "fuel_auto", self.fuel_auto_var.get()))
+
+        # Load config + active profile once; everything else reads from the store
+        self.profiles = ProfileStore()
+        self.apply_profile_values(self.profiles.get(self.profiles.active))
+        global game, module
+        if game is None:
+            game = self.profiles.settings.get("game")
+        if module is None:
+            module = self.profiles.settings.get("module")
 
         # Build UI
         self._build_ui()
 
         # run initial attach & read
         self.root.after(100, self.startup_attach_and_read)
+        self.root.after(UI_POLL_MS, self._drain_ui)
+
+    def _post(self, fn):
+        """Run `fn` on the Tk thread; safe from any thread (never blocks on Tk)."""
+        self.ui_queue.put(fn)
+
+    def _drain_ui(self):
+        while True:
+            try:
+                fn = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn()
+            except Exception as e:
+                print(f"UI callback failed: {e}")
+        self.root.after(UI_POLL_MS, self._drain_ui)
+
+    def _on_fuel_var(self, *_):
+        try:
+            self.fuel_value = float(self.fuel_var.get() or "100.0")
+        except ValueError:
+            self.fuel_value = 100.0
+
+    def apply_profile_values(self, data):
+        self.coin_var.set(data.get("coin", "0"))
+        self.diamond_var.set(data.get("diamond", "0"))
+        self.fuel_var.set(data.get("fuel", "100.00"))
+        self.boost_var.set(data.get("boost", "0"))
+        self.fuel_auto_var.set(data.get("fuel_auto", False))
 
     def _load_icon(self, path, size):
         if PIL_AVAILABLE and os.path.exists(path):
@@ -354,6 +229,7 @@ class TrainerApp:
         tk.Entry(fuel_frame, textvariable=self.fuel_var).pack(side="left", padx=5)
         self.fuel_toggle_btn = tk.Button(fuel_frame, text="Infinite Fuel: OFF", command=self.toggle_fuel)
         self.fuel_toggle_btn.pack(side="left", padx=5)
+        tk.Checkbutton(fuel_frame, text="Auto (race start)", variable=self.fuel_auto_var).pack(side="left", padx=5)
 
         # Boosts
         boost_frame = tk.Frame(main)
@@ -368,12 +244,33 @@ class TrainerApp:
         tk.Button(boost_frame, text="Set", command=self.set_boosts).pack(side="left", padx=5)
         tk.Button(boost_frame, text="Recalibrate Pointer", command=self.recalibrate_boosts).pack(side="left", padx=5)
 
+        # Recorder
+        rec_frame = tk.Frame(main)
+        rec_frame.pack(fill="x", pady=5)
+        tk.Label(rec_frame, text="Recorder (60 Hz)").pack(side="left")
+        self.record_btn = tk.Button(rec_frame, text="Record: OFF", command=self.toggle_recording)
+        self.record_btn.pack(side="left", padx=5)
+
+        # Snapshots
+        snap_frame = tk.Frame(main)
+        snap_frame.pack(fill="x", pady=5)
+        tk.Label(snap_frame, text="Snapshots").pack(side="left")
+        self.snapshot_box = ttk.Combobox(snap_frame, state="readonly", width=28)
+        self.snapshot_box.pack(side="left", padx=5)
+        tk.Button(snap_frame, text="Take", command=lambda: self.take_snapshot("manual")).pack(side="left", padx=5)
+        tk.Button(snap_frame, text="Restore", command=self.restore_snapshot).pack(side="left", padx=5)
+
+        # live values (fed by the change watcher)
+        self.live_label = tk.Label(main, text="")
+        self.live_label.pack()
+
         # status label
         self.status_label = tk.Label(main, text="Initializing...")
         self.status_label.pack(pady=10)
 
         # bottom controls
         tk.Button(main, text="Hotkeys & Save", command=self.open_hotkeys_window).pack(pady=10)
+        tk.Button(main, text="Scripts", command=self.open_scripts_window).pack()
 
     def hotkey_keypress(self, event, var):
         if event.keysym in ('Control_L', 'Control_R', 'Shift_L', 'Shift_R', 'Alt_L', 'Alt_R'):
@@ -405,32 +302,29 @@ class TrainerApp:
                 return previous_hk
             def cb():
                 if title.lower().startswith("coins"):
-                    addr = self.compute_coins_addr()
+                    addr = self.session.field_addr("coins")
                     if mode_var.get() == "Set":
-                        self.root.after(10, lambda: self._write_safe_uint(addr, intval))
+                        self._write_safe_uint(addr, intval, f"hotkey {title}")
                     else:
-                        def inc():
-                            try:
-                                cur = self.mem.read_uint(addr)
-                            except:
-                                cur = 0
-                            self._write_safe_uint(addr, cur + intval)
-                        self.root.after(10, inc)
+                        try:
+                            cur = self.mem.read_uint(addr)
+                        except:
+                            cur = 0
+                        self._write_safe_uint(addr, cur + intval, f"hotkey {title}")
                 else:
-                    addr = self.compute_diamonds_addr()
+                    addr = self.session.field_addr("diamonds")
                     if mode_var.get() == "Set":
-                        self.root.after(10, lambda: self._write_safe_uint(addr, intval))
+                        self._write_safe_uint(addr, intval, f"hotkey {title}")
                     else:
-                        def inc2():
-                            try:
-                                cur = self.mem.read_uint(addr)
-                            except:
-                                cur = 0
-                            self._write_safe_uint(addr, cur + intval)
-                        self.root.after(10, inc2)
+                        try:
+                            cur = self.mem.read_uint(addr)
+                        except:
+                            cur = 0
+                        self._write_safe_uint(addr, cur + intval, f"hotkey {title}")
             try:
-                keyboard.add_hotkey(hk, cb)
-                self.registered_hotkeys.append({'hotkey': hk, 'cb': cb})
+                # runs on the Tk thread (Tk vars, message boxes), see HotkeyHub(dispatch=...)
+                handle = self.hotkeys.add(hk, cb)
+                self.registered_hotkeys.append({'hotkey': hk, 'cb': cb, 'handle': handle})
                 self.status_label.config(text=f"Registered hotkey {hk}")
                 return hk
             except Exception as e:
@@ -438,15 +332,7 @@ class TrainerApp:
                 act_var.set(False)
                 return previous_hk
         else:
-            hk = hk_var.get().strip()
-            try:
-                keyboard.remove_hotkey(previous_hk)
-            except Exception:
-                try:
-                    keyboard.clear_all_hotkeys()
-                    self.registered_hotkeys.clear()
-                except:
-                    pass
+            self.unregister_hotkey(previous_hk)
             return previous_hk
 
     def register_fuel_hotkey(self, hk_var, act_var, previous_hk):
@@ -457,10 +343,10 @@ class TrainerApp:
                 act_var.set(False)
                 return previous_hk
             def fuel_cb():
-                self.root.after(10, lambda: self.toggle_fuel())
+                self.toggle_fuel()
             try:
-                keyboard.add_hotkey(hk, fuel_cb)
-                self.registered_hotkeys.append({'hotkey': hk, 'cb': fuel_cb})
+                handle = self.hotkeys.add(hk, fuel_cb)
+                self.registered_hotkeys.append({'hotkey': hk, 'cb': fuel_cb, 'handle': handle})
                 self.status_label.config(text=f"Registered fuel hotkey {hk}")
                 return hk
             except Exception as e:
@@ -468,17 +354,17 @@ class TrainerApp:
                 act_var.set(False)
                 return previous_hk
         else:
-            hk = hk_var.get().strip()
-            try:
-                keyboard.remove_hotkey(previous_hk)
-            except:
-                try:
-                    keyboard.clear_all_hotkeys()
-                    self.registered_hotkeys.clear()
-                except:
-                    pass
+            self.unregister_hotkey(previous_hk)
             return previous_hk
 
+    def unregister_hotkey(self, hk):
+        """Drop one registration of `hk` (the table entry only; the hook stays in place)."""
+        for entry in self.registered_hotkeys:
+            if entry['hotkey'] == hk:
+                self.hotkeys.remove(entry['handle'])
+                self.registered_hotkeys.remove(entry)
+                return
+
     # ---------------------------
     # Start: attach to process and auto-read coins/diamonds
     # ---------------------------
@@ -493,69 +379,56 @@ class TrainerApp:
             # attach mem
             self.status_label.config(text=f"Attaching to {game}...")
             self.root.update()
-            self.mem.attach_by_name(game)
+            self.session.attach(game, module)
             self.status_label.config(text=f"Attached to PID {self.mem.pid}")
-            # resolve base addresses using provided funcs if pymem available
-            if PYMEM_AVAILABLE:
-                try:
-                    self.base_address = get_base_address(game)
-                except Exception:
-                    self.base_address = 0
-                if module:
-                    try:
-                        self.module_base = get_module_base_address(game, module)
-                    except Exception:
-                        self.module_base = 0
-                else:
-                    self.module_base = 0
-            # auto-read coins and diamonds
+            # auto-read coins and diamonds (base addresses come from the same handle, no second open)
             try:
-                coins_addr = int(self.base_address) + COINS_OFFSET
-                diamonds_addr = int(self.base_address) + DIAMONDS_OFFSET
-                # read (uint)
-                try:
-                    cval = self.mem.read_uint(coins_addr)
-                except Exception:
-                    cval = 0
+                coins_addr = self.session.field_addr("coins")
+                diamonds_addr = self.session.field_addr("diamonds")
+                # one read of the whole globals block, both values decoded at once
                 try:
-                    dval = self.mem.read_uint(diamonds_addr)
+                    wallet = self.session.globals_view().read().values()
+                    cval, dval = wallet["coins"], wallet["diamonds"]
                 except Exception:
-                    dval = 0
+                    cval = dval = 0
                 self.coin_var.set(str(cval))
                 self.diamond_var.set(str(dval))
                 self.status_label.config(text=f"Ready. Coins: {cval} Diamonds: {dval}")
+                self.watcher.watch(coins_addr, 4, lambda ev: self._on_live_change("Coins", ev))
+                self.watcher.watch(diamonds_addr, 4, lambda ev: self._on_live_change("Diamonds", ev))
+                self.watcher.start()
             except Exception as e:
                 # if reading fails, still allow user to proceed
                 self.status_label.config(text=f"Ready (couldn't auto-read coins/diamonds): {e}")
+            # race start / end drive auto fuel and script events
+            if self.session.base_address:
+                self.start_race_detector()
         except Exception as e:
             messagebox.showerror("Attach failed", f"Could not find or attach to process '{game}'. Error: {e}\nThe trainer will now exit.")
             self.root.destroy()
             return
 
+    def _on_live_change(self, name, ev):
+        # watcher thread -> Tk thread
+        self.live[name] = struct.unpack('<I', ev.new)[0]
+        text = "  ".join(f"{k}: {v}" for k, v in self.live.items())
+        self._post(lambda: self.live_label.config(text=f"Live  {text}"))
+
     # ---------------------------
     # Coins / Diamonds handlers
     # ---------------------------
-    def _write_safe_uint(self, addr, value):
+    def _write_safe_uint(self, addr, value, label="write"):
         try:
             if value < 0 or value > 0xFFFFFFFF:
                 messagebox.showerror("Range error", "Value out of 32-bit unsigned range.")
                 return False
+            self.take_snapshot(label)
             self.mem.write_uint(addr, int(value))
             return True
         except Exception as e:
             messagebox.showerror("Write error", str(e))
             return False
 
-    def compute_coins_addr(self):
-        if not self.base_address:
-            raise RuntimeError("Base address unknown.")
-        return int(self.base_address) + COINS_OFFSET
-
-    def compute_diamonds_addr(self):
-        if not self.base_address:
-            raise RuntimeError("Base address unknown.")
-        return int(self.base_address) + DIAMONDS_OFFSET
-
     def set_coins(self):
         s = self.coin_var.get().strip()
         try:
@@ -564,22 +437,22 @@ class TrainerApp:
             messagebox.showerror("Invalid", "Enter a valid integer for coins.")
             return
         try:
-            addr = self.compute_coins_addr()
-            if self._write_safe_uint(addr, v):
+            addr = self.session.field_addr("coins")
+            if self._write_safe_uint(addr, v, "set coins"):
                 self.status_label.config(text=f"Coins set to {v}")
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def add_100m_coins(self):
         try:
-            addr = self.compute_coins_addr()
+            addr = self.session.field_addr("coins")
             try:
                 cur = self.mem.read_uint(addr)
             except Exception:
                 cur = 0
             new = cur + 100_000_000
             self.coin_var.set(str(new))
-            self._write_safe_uint(addr, new)
+            self._write_safe_uint(addr, new, "+100M coins")
             self.status_label.config(text=f"Added 100M. Coins: {new}")
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -592,84 +465,198 @@ class TrainerApp:
             messagebox.showerror("Invalid", "Enter a valid integer for diamonds.")
             return
         try:
-            addr = self.compute_diamonds_addr()
-            if self._write_safe_uint(addr, v):
+            addr = self.session.field_addr("diamonds")
+            if self._write_safe_uint(addr, v, "set diamonds"):
                 self.status_label.config(text=f"Diamonds set to {v}")
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def add_100m_diamonds(self):
         try:
-            addr = self.compute_diamonds_addr()
+            addr = self.session.field_addr("diamonds")
             try:
                 cur = self.mem.read_uint(addr)
             except Exception:
                 cur = 0
             new = cur + 100_000_000
             self.diamond_var.set(str(new))
-            self._write_safe_uint(addr, new)
+            self._write_safe_uint(addr, new, "+100M diamonds")
             self.status_label.config(text=f"Added 100M. Diamonds: {new}")
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     # ---------------------------
-    # Fuel freeze (writes float(100.00) as bytes repeatedly)
+    # Snapshots (undo for mods)
+    # ---------------------------
+    def _managed_targets(self):
+        """name -> (current address, struct code) for every managed value that resolves right now."""
+        targets = {}
+        for name, field in FIELDS.items():
+            if name == "fuel" and self.race is not None:
+                # the detector holds the live fuel object; between races there is no fuel to save
+                fuel_addr = self.race.fuel_addr
+                if fuel_addr:
+                    targets[name] = (fuel_addr, field.code)
+                continue
+            try:
+                targets[name] = (self.session.field_addr(name), field.code)
+            except Exception:
+                pass
+        return targets
+
+    def take_snapshot(self, label):
+        try:
+            self.snapshots.take(self._managed_targets(), label)
+        except Exception:
+            return
+        self._refresh_snapshots()
+
+    def _refresh_snapshots(self):
+        self._snapshot_list = self.snapshots.history()
+        labels = [f"{time.strftime('%H:%M:%S', time.localtime(snap.t))} before {snap.label}" for snap in self._snapshot_list]
+        self.snapshot_box.config(values=labels)
+        if labels:
+            self.snapshot_box.current(0)
+
+    def restore_snapshot(self):
+        idx = self.snapshot_box.current()
+        if idx < 0 or not getattr(self, "_snapshot_list", None):
+            messagebox.showinfo("Snapshots", "No snapshot taken yet.")
+            return
+        snap = self._snapshot_list[idx]
+        # pointer values (fuel, boost) only go back if their object hasn't moved since
+        current = self._managed_targets()
+        names = [n for n, (addr, _) in snap.targets.items() if current.get(n, (None,))[0] == addr]
+        try:
+            writes = self.snapshots.restore(snap, names)
+        except Exception as e:
+            messagebox.showerror("Restore failed", str(e))
+            return
+        values = snap.values()
+        if "coins" in names:
+            self.coin_var.set(str(values["coins"]))
+        if "diamonds" in names:
+            self.diamond_var.set(str(values["diamonds"]))
+        skipped = sorted(set(snap.targets) - set(names))
+        note = f" (skipped moved: {', '.join(skipped)})" if skipped else ""
+        self.status_label.config(text=f"Restored {len(names)} values in {writes} write(s){note}")
+
+    # ---------------------------
+    # Fuel freeze (rewrites float(100.00) as bytes whenever the game changes it)
     # ---------------------------
     def toggle_fuel(self):
         if not self.fuel_freezing:
-            # start freeze
+            # start freeze (fuel object pointer followed strictly: nothing to freeze outside a race)
             try:
-                if not self.base_address:
-                    raise RuntimeError("Base address unknown.")
-                fuel_base = int(self.base_address) + FUEL_BASE_OFFSET
-                try:
-                    fuel_addr = self.mem.resolve_pointer(fuel_base, FUEL_OFFSETS)
-                except Exception:
-                    fuel_addr = fuel_base + (FUEL_OFFSETS[0] if FUEL_OFFSETS else 0)
-                self.fuel_addr = fuel_addr
+                fuel_addr = self.session.field_addr("fuel")
             except Exception as e:
                 messagebox.showerror("Fuel pointer error", f"Could not resolve fuel address: {e}")
                 return
-            # start thread
-            self.fuel_freeze_event.clear()
-            self.fuel_thread = threading.Thread(target=self._fuel_freeze_worker, daemon=True)
-            self.fuel_freezing = True
-            self.fuel_thread.start()
-            self.fuel_toggle_btn.config(text="Infinite Fuel: ON")
-            self.status_label.config(text="Infinite Fuel enabled")
+            self.arm_fuel(fuel_addr)
         else:
-            # stop
-            self.fuel_freeze_event.set()
+            self.disarm_fuel()
+
+    def arm_fuel(self, fuel_addr):
+        """Freeze fuel at `fuel_addr`; safe to call from any thread."""
+        # pack float value to bytes once (fuel_value mirrors the entry, see _on_fuel_var)
+        packed = struct.pack('<f', self.fuel_value)  # float bytes
+        # rewrite whenever the watcher sees the game change it (instead of blind writes)
+        def on_fuel(ev):
+            if ev.new != packed:
+                try:
+                    self.mem.write_bytes(ev.addr, packed)
+                except Exception as e:
+                    msg = f"Fuel write error: {e}"
+                    self._post(lambda: self.status_label.config(text=msg))
+        with self.fuel_lock:
+            if self.fuel_watch:
+                self.watcher.unwatch(self.fuel_watch)
+            self.fuel_addr = fuel_addr
+            self.fuel_watch = self.watcher.watch(fuel_addr, 4, on_fuel)
+            self.fuel_freezing = True
+        self.watcher.start()
+        self._post(lambda: self.fuel_toggle_btn.config(text="Infinite Fuel: ON"))
+        self._post(lambda: self.status_label.config(text="Infinite Fuel enabled"))
+
+    def disarm_fuel(self):
+        with self.fuel_lock:
+            if self.fuel_watch:
+                self.watcher.unwatch(self.fuel_watch)
+                self.fuel_watch = None
             self.fuel_freezing = False
-            self.fuel_toggle_btn.config(text="Infinite Fuel: OFF")
-            self.status_label.config(text="Infinite Fuel disabled")
+        self._post(lambda: self.fuel_toggle_btn.config(text="Infinite Fuel: OFF"))
+        self._post(lambda: self.status_label.config(text="Infinite Fuel disabled"))
+
+    # ---------------------------
+    # Race start / end (auto-arm infinite fuel, script events)
+    # ---------------------------
+    def start_race_detector(self):
+        self.race = RaceDetector(self.mem, self.session.field_base("fuel"), FIELDS["fuel"].chain,
+                                 self._on_race_start, self._on_race_end)
+        self.race.start()
+
+    def _on_race_start(self, fuel_addr):
+        # detector thread: arm first, then tell the UI and scripts
+        if self.fuel_auto:
+            self.arm_fuel(fuel_addr)
+        self._retarget_recorder(fuel_addr)
+        self.scripts.emit("race_start")
+        self._post(lambda: self.status_label.config(text=f"Race started (fuel at {hex(fuel_addr)})"))
+
+    def _on_race_end(self):
+        # the fuel object is gone: drop any freeze (manual or auto) so nothing writes into it
+        if self.fuel_freezing:
+            self.disarm_fuel()
+        self._retarget_recorder(None)
+        self.scripts.emit("race_end")
+        self._post(lambda: self.status_label.config(text="Race ended"))
 
-    def _fuel_freeze_worker(self):
-        # pack float value to bytes once
+    # ---------------------------
+    # Recording coins / diamonds / fuel / boosts over a race
+    # ---------------------------
+    def _recorder_addrs(self, fuel_addr):
+        """Current addresses of the recorded fields; fuel only exists during a race."""
+        addrs = {"coins": self.session.field_addr("coins"), "diamonds": self.session.field_addr("diamonds"),
+                 "fuel": fuel_addr}
         try:
-            val = float(self.fuel_var.get() or "100.0")
-        except:
-            val = 100.0
-        packed = struct.pack('<f', val)  # float bytes
-        # continuous write until event set
-        interval = 0.11
-        while not self.fuel_freeze_event.is_set():
+            addrs["boost"] = self.session.field_addr("boost")
+        except Exception:
+            addrs["boost"] = None
+        return addrs
+
+    def _retarget_recorder(self, fuel_addr):
+        # detector thread: the fuel object (and the boost chain with it) is replaced on race start / end
+        with self.recorder_lock:
+            if self.recorder is not None:
+                addrs = self._recorder_addrs(fuel_addr)
+                self.recorder.retarget({"fuel": addrs["fuel"], "boost": addrs["boost"]})
+
+    def toggle_recording(self):
+        if self.recorder is None:
             try:
-                # write the float bytes so memory contains float bits (even if we write as raw bytes)
-                self.mem.write_bytes(self.fuel_addr, packed)
+                path = os.path.join(RECORDINGS_DIR, time.strftime("race_%Y%m%d_%H%M%S.hcrrec"))
+                # under the lock so a race start / end can't slip in between resolving and starting
+                with self.recorder_lock:
+                    fuel_addr = self.race.fuel_addr if self.race is not None else None
+                    self.recorder = ValueRecorder(self.mem, self._recorder_addrs(fuel_addr), path, watcher=self.watcher)
+                    self.watcher.start()
+                    self.recorder.start()
             except Exception as e:
-                # update status and break if persistent failure
-                self.status_label.config(text=f"Fuel write error: {e}")
-            time.sleep(interval)
+                self.recorder = None
+                messagebox.showerror("Recorder", f"Could not start recording: {e}")
+                return
+            self.record_btn.config(text="Record: ON")
+            self.status_label.config(text=f"Recording to {path}")
+        else:
+            with self.recorder_lock:
+                rec, self.recorder = self.recorder, None
+            rec.stop()
+            self.record_btn.config(text="Record: OFF")
+            self.status_label.config(text=f"Saved {rec.samples} samples to {rec.path} (max lateness {rec.max_lateness * 1000:.1f} ms)")
 
     # ---------------------------
     # Boosts and recalibration
     # ---------------------------
-    def compute_boost_base(self):
-        if not self.module_base:
-            raise RuntimeError("Module base unknown. Set module variable if needed.")
-        return int(self.module_base) + BOOST_BASE_OFFSET
-
     def set_boosts(self):
         s = self.boost_var.get().strip()
         try:
@@ -685,9 +672,12 @@ class TrainerApp:
         if not proceed:
             return
         try:
-            base = self.compute_boost_base()
-            resolved = self.mem.resolve_pointer(base, BOOST_OFFSETS)
-            self.mem.write_int(resolved, v)
+            # one read of the boost object, then only the changed field goes back
+            view = self.session.boost_object_view().read()
+            self.take_snapshot("set boosts")
+            view["boost"] = v
+            view.write_dirty()
+            resolved = view.field_addr("boost")
             messagebox.showinfo("Done", f"Wrote boosts={v} at {hex(resolved)}")
             self.status_label.config(text=f"Boosts set: {v}")
         except Exception as e:
@@ -701,22 +691,19 @@ class TrainerApp:
             return
         # attempt secondary then third offsets
         try:
-            base = self.compute_boost_base()
+            self.session.field_base("boost")
         except Exception as e:
             messagebox.showerror("Error", f"Module base unknown: {e}")
             return
         for offsets in (BOOST_SECONDARY_OFFSETS, BOOST_THIRD_OFFSETS):
             try:
-                resolved = self.mem.resolve_pointer(base, offsets)
-                try:
-                    val = self.mem.read_int(resolved)
-                    self.status_label.config(text=f"Recalibrated. Addr {hex(resolved)} val {val}")
-                    messagebox.showinfo("Recalibration success", f"Used offsets {offsets}. Resolved addr {hex(resolved)} with value {val}")
-                    return
-                except Exception:
-                    continue
+                view = self.session.boost_object_view(offsets).read()
             except Exception:
                 continue
+            resolved, val = view.field_addr("boost"), view["boost"]
+            self.status_label.config(text=f"Recalibrated. Addr {hex(resolved)} val {val}")
+            messagebox.showinfo("Recalibration success", f"Used offsets {offsets}. Resolved addr {hex(resolved)} with value {val}")
+            return
         messagebox.showerror("Recalibration failed", "Could not recalibrate with provided alternate offsets.")
 
     # ---------------------------
@@ -750,11 +737,26 @@ class TrainerApp:
 
         # header
         tk.Label(wh, text="Hotkeys (Coins / Diamonds / Fuel toggle)").pack(pady=10)
+        latency_label = tk.Label(wh, text="")
+        latency_label.pack()
+
+        def show_latency():
+            if not wh.winfo_exists():
+                return
+            st = self.hotkeys.stats()
+            if st["count"]:
+                latency_label.config(text=f"Hotkey latency: p50 {st['p50_ms']:.2f} ms, p99 {st['p99_ms']:.2f} ms, "
+                                          f"max {st['max_ms']:.2f} ms ({st['count']} fired)")
+            wh.after(1000, show_latency)
+        show_latency()
 
         container = tk.Frame(wh)
         container.pack(fill="both", expand=True, padx=10, pady=10)
 
-        self.registered_hotkeys = []  # store dicts
+        # the window re-applies the active profile's hotkeys below, so drop the previous window's ones first
+        for entry in self.registered_hotkeys:
+            self.hotkeys.remove(entry['handle'])
+        self.registered_hotkeys = []
 
         def make_hotkey_row(title):
             row = tk.Frame(container)
@@ -773,10 +775,7 @@ class TrainerApp:
             previous_hk = [hk_var.get()]  # use list for mutable
             def on_hk_change(*args):
                 if act_var.get() and hk_var.get() != previous_hk[0]:
-                    try:
-                        keyboard.remove_hotkey(previous_hk[0])
-                    except:
-                        pass
+                    self.unregister_hotkey(previous_hk[0])
                     act_var.set(False)
             hk_var.trace("w", on_hk_change)
             tk.Checkbutton(row, text="Active", variable=act_var, command=lambda: previous_hk.append(self.register_hotkey(title, mode_var, val_var, hk_var, act_var, previous_hk[0])) and previous_hk.pop(0)).pack(side="left", padx=5)
@@ -800,49 +799,62 @@ class TrainerApp:
         f_previous_hk = [fhk_var.get()]  # mutable
         def f_on_hk_change(*args):
             if factive.get() and fhk_var.get() != f_previous_hk[0]:
-                try:
-                    keyboard.remove_hotkey(f_previous_hk[0])
-                except:
-                    pass
+                self.unregister_hotkey(f_previous_hk[0])
                 factive.set(False)
         fhk_var.trace("w", f_on_hk_change)
         tk.Checkbutton(frow, text="Active", variable=factive, command=lambda: f_previous_hk.append(self.register_fuel_hotkey(fhk_var, factive, f_previous_hk[0])) and f_previous_hk.pop(0)).pack(side="left", padx=5)
         tk.Button(frow, text="Clear", command=lambda: [fhk_var.set(""), factive.set(False)]).pack(side="left", padx=5)
 
-        # Load from config
+        # profile picker
+        prow = tk.Frame(wh)
+        prow.pack(fill="x", padx=10, pady=5)
+        tk.Label(prow, text="Profile").pack(side="left", padx=5)
+        profile_var = tk.StringVar(value=self.profiles.active)
+        profile_box = ttk.Combobox(prow, textvariable=profile_var, values=self.profiles.names())
+        profile_box.pack(side="left", padx=5)
+
+        def apply_hotkeys(h):
+            rows = (("coins", "Coins", coin_tuple), ("diamonds", "Diamonds", diam_tuple))
+            for key, title, (mode_var, val_var, hk_var, act_var) in rows:
+                if act_var.get():
+                    self.unregister_hotkey(hk_var.get())
+                    act_var.set(False)
+                if key in h:
+                    mode_var.set(h[key].get("mode", "Set"))
+                    val_var.set(h[key].get("value", "100000"))
+                    hk_var.set(h[key].get("hotkey", ""))
+                    active = h[key].get("active", False)
+                    act_var.set(active)
+                    if active:
+                        self.register_hotkey(title, mode_var, val_var, hk_var, act_var, hk_var.get())
+            if factive.get():
+                self.unregister_hotkey(fhk_var.get())
+                factive.set(False)
+            if "fuel" in h:
+                fhk_var.set(h["fuel"].get("hotkey", ""))
+                active = h["fuel"].get("active", False)
+                factive.set(active)
+                if active:
+                    self.register_fuel_hotkey(fhk_var, factive, fhk_var.get())
+
+        # Load from the in-memory profile store (no file re-read)
         try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, "r") as fh:
-                    data = json.load(fh)
-                if "hotkeys" in data:
-                    h = data["hotkeys"]
-                    if "coins" in h:
-                        mode_var, val_var, hk_var, act_var = coin_tuple
-                        mode_var.set(h["coins"].get("mode", "Set"))
-                        val_var.set(h["coins"].get("value", "100000"))
-                        hk_var.set(h["coins"].get("hotkey", ""))
-                        active = h["coins"].get("active", False)
-                        act_var.set(active)
-                        if active:
-                            self.register_hotkey("Coins", mode_var, val_var, hk_var, act_var, hk_var.get())
-                    if "diamonds" in h:
-                        mode_var, val_var, hk_var, act_var = diam_tuple
-                        mode_var.set(h["diamonds"].get("mode", "Set"))
-                        val_var.set(h["diamonds"].get("value", "100000"))
-                        hk_var.set(h["diamonds"].get("hotkey", ""))
-                        active = h["diamonds"].get("active", False)
-                        act_var.set(active)
-                        if active:
-                            self.register_hotkey("Diamonds", mode_var, val_var, hk_var, act_var, hk_var.get())
-                    if "fuel" in h:
-                        fhk_var.set(h["fuel"].get("hotkey", ""))
-                        active = h["fuel"].get("active", False)
-                        factive.set(active)
-                        if active:
-                            self.register_fuel_hotkey(fhk_var, factive, fhk_var.get())
+            apply_hotkeys(self.profiles.get(self.profiles.active).get("hotkeys", {}))
         except Exception:
             pass
 
+        def load_profile():
+            name = profile_var.get().strip()
+            data = self.profiles.get(name)
+            if not data:
+                messagebox.showerror("Profile", f"No profile named '{name}'.")
+                return
+            self.apply_profile_values(data)
+            apply_hotkeys(data.get("hotkeys", {}))
+            self.profiles.update_settings(active_profile=name)
+            self.status_label.config(text=f"Loaded profile '{name}'")
+        tk.Button(prow, text="Load", command=load_profile).pack(side="left", padx=5)
+
         # Save button (only here)
         def save_profile():
             coin_mode_var, coin_val_var, coin_hk_var, coin_act_var = coin_tuple
@@ -853,41 +865,100 @@ class TrainerApp:
                 "fuel": {"hotkey": fhk_var.get(), "active": factive.get()}
             }
             data = {
-                "game": game,
-                "module": module,
                 "coin": self.coin_var.get(),
                 "diamond": self.diamond_var.get(),
                 "fuel": self.fuel_var.get(),
                 "boost": self.boost_var.get(),
+                "fuel_auto": self.fuel_auto_var.get(),
                 "hotkeys": hotkeys
             }
+            name = profile_var.get().strip()
             try:
-                with open(CONFIG_PATH, "w") as fh:
-                    json.dump(data, fh, indent=2)
-                messagebox.showinfo("Saved", f"Profile saved to {CONFIG_PATH}")
+                # written in the background (debounced, atomic replace)
+                self.profiles.put(name, data)
+                self.profiles.update_settings(game=game, module=module, active_profile=name)
+                profile_box.config(values=self.profiles.names())
+                self.status_label.config(text=f"Profile '{name}' saved")
             except Exception as e:
                 messagebox.showerror("Save error", str(e))
         tk.Button(wh, text="Save Profile", command=save_profile).pack(pady=10)
 
         tk.Button(wh, text="Close", command=wh.destroy).pack(pady=10)
 
+    # ---------------------------
+    # Scripts window (scripts/<name>.json, see SCRIPT_STEPS)
+    # ---------------------------
+    def _script_log(self, name, msg):
+        # engine thread -> Tk thread
+        self._post(lambda: self.status_label.config(text=f"[{name}] {msg}"))
+
+    def open_scripts_window(self):
+        ws = tk.Toplevel(self.root)
+        ws.title("Scripts")
+        tk.Label(ws, text=f"Scripts from ./{SCRIPTS_DIR}/*.json").pack(pady=10)
+        lb = tk.Listbox(ws, height=10, width=40)
+        lb.pack(padx=10, pady=5)
+        state = {"scripts": {}}
+
+        def refresh():
+            state["scripts"] = load_scripts()
+            running = set(self.scripts.running())
+            lb.delete(0, "end")
+            for name in state["scripts"]:
+                lb.insert("end", f"{name}  (running)" if name in running else name)
+
+        def selected():
+            sel = lb.curselection()
+            return list(state["scripts"])[sel[0]] if sel else None
+
+        def run():
+            name = selected()
+            if name:
+                self.scripts.run(name, state["scripts"][name])
+                ws.after(50, refresh)
+
+        def stop():
+            name = selected()
+            if name:
+                self.scripts.cancel(name)
+                ws.after(50, refresh)
+
+        row = tk.Frame(ws)
+        row.pack(pady=10)
+        tk.Button(row, text="Run", command=run).pack(side="left", padx=5)
+        tk.Button(row, text="Stop", command=stop).pack(side="left", padx=5)
+        tk.Button(row, text="Refresh", command=refresh).pack(side="left", padx=5)
+        tk.Button(ws, text="Close", command=ws.destroy).pack(pady=10)
+        refresh()
+
     # ---------------------------
     # Save on exit & cleanup
     # ---------------------------
     def cleanup_and_exit(self):
+        # background callbacks only post to ui_queue, so the joins below can't wait on this thread;
+        # the timeouts still keep a stuck read from hanging the exit
         try:
-            if self.fuel_freezing:
-                self.fuel_freeze_event.set()
-                time.sleep(0.12)
+            self.scripts.stop(STOP_TIMEOUT)
         except:
             pass
         try:
-            # clear hotkeys
-            if KEYBOARD_AVAILABLE:
-                try:
-                    keyboard.clear_all_hotkeys()
-                except:
-                    pass
+            if self.recorder:
+                self.recorder.stop()
+        except:
+            pass
+        try:
+            if self.race:
+                self.race.stop(STOP_TIMEOUT)
+            self.watcher.stop(STOP_TIMEOUT)
+        except:
+            pass
+        try:
+            # one unhook removes every hotkey
+            self.hotkeys.stop()
+        except:
+            pass
+        try:
+            self.profiles.flush()
         except:
             pass
         try: